@@ -3,13 +3,21 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import plotly.graph_objects as go
-from calculator import (
-    calculate_api_cost, 
-    optimize_api_usage, 
-    analyze_dev_tools,
-    generate_summary_report
-)
-from pricing_data import API_PRICING, DEV_TOOLS
+import instrumentation
+from calculator import active_pricing
+from forecast import forecast_spend, model_config
+from portfolio import PORTFOLIO_FIELDS, read_portfolio_csv, submit_portfolio
+from pricing_store import default_store
+from result_cache import RESULT_CACHE, LRUCache, cached_api_cost, cached_analysis
+from sensitivity_grid import sensitivity_grid
+
+# Hot-reload pricing from pricing.json when one is deployed next to the app
+default_store()
+
+def render_chart(name, fig):
+    """Render a Plotly figure, timed when instrumentation is enabled"""
+    with instrumentation.timer(f'app.chart.{name}'):
+        st.plotly_chart(fig, use_container_width=True)
 
 # Page config
 st.set_page_config(
@@ -39,7 +47,7 @@ if 'analysis_done' not in st.session_state:
     st.session_state.analysis_done = False
 
 # Create tabs
-tab1, tab2, tab3 = st.tabs(["🤖 API Usage", "👨‍💻 Developer Tools", "📊 Results"])
+tab1, tab2, tab3, tab4 = st.tabs(["🤖 API Usage", "👨‍💻 Developer Tools", "📊 Results", "📁 Portfolio"])
 
 # TAB 1: API Usage
 with tab1:
@@ -50,13 +58,13 @@ with tab1:
     with col1:
         provider = st.selectbox(
             "API Provider",
-            options=['openai', 'anthropic', 'google', 'deepseek', 'mistral', 'cohere', 'xai'],
+            options=list(active_pricing()['api_pricing']),
             format_func=lambda x: x.title()
         )
         
         current_model = st.selectbox(
             "Current Model",
-            options=list(API_PRICING[provider].keys())
+            options=list(active_pricing()['api_pricing'][provider].keys())
         )
         
         monthly_calls = st.number_input(
@@ -89,13 +97,62 @@ with tab1:
     
     # Show current cost
     if monthly_calls > 0:
-        current_api_cost = calculate_api_cost(provider, current_model, monthly_calls, avg_input_tokens, avg_output_tokens)
+        current_api_cost = cached_api_cost(provider, current_model, monthly_calls, avg_input_tokens, avg_output_tokens)
         st.markdown("---")
         col1, col2 = st.columns(2)
         with col1:
             st.metric("Current Monthly Cost", f"${current_api_cost:,.2f}")
         with col2:
             st.metric("Annual Cost", f"${current_api_cost * 12:,.2f}")
+        
+        # What-if views from the precomputed grid: no recalculation on input changes
+        grid = sensitivity_grid()
+        with st.expander("🔍 What-if: cost surfaces and break-even maps"):
+            names = [f"{p.title()} {m}" for p, m in grid.model_keys]
+            cheapest = grid.cheapest_map()
+            marker = go.Scatter(x=[max(avg_output_tokens, 1)], y=[max(avg_input_tokens, 1)], mode='markers',
+                                marker=dict(color='white', size=12, line=dict(color='black', width=2)), name='You')
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("**Cheapest model by token mix**")
+                fig = go.Figure(go.Heatmap(
+                    x=grid.output_axis, y=grid.input_axis, z=cheapest, colorscale='Turbo', showscale=False,
+                    text=[[names[k] if k >= 0 else 'No model fits' for k in row] for row in cheapest.tolist()],
+                    hovertemplate='%{text}<br>input %{y:,.0f} · output %{x:,.0f}<extra></extra>',
+                ))
+                fig.add_trace(marker)
+                fig.update_layout(height=350, xaxis=dict(type='log', title='Output tokens'),
+                                  yaxis=dict(type='log', title='Input tokens'), showlegend=False)
+                render_chart('cheapest_model_map', fig)
+            with col2:
+                st.markdown(f"**Savings available vs {current_model}**")
+                fig = go.Figure(go.Heatmap(
+                    x=grid.output_axis, y=grid.input_axis, z=grid.savings_map((provider, current_model)) * 100,
+                    colorscale='Greens', zmin=0, zmax=100, colorbar=dict(title='%'),
+                    hovertemplate='%{z:.0f}% cheaper<br>input %{y:,.0f} · output %{x:,.0f}<extra></extra>',
+                ))
+                fig.add_trace(marker)
+                fig.update_layout(height=350, xaxis=dict(type='log', title='Output tokens'),
+                                  yaxis=dict(type='log', title='Input tokens'), showlegend=False)
+                render_chart('savings_map', fig)
+            
+            st.markdown(f"**Monthly cost of {current_model} at {avg_output_tokens:,} output tokens**")
+            fig = go.Figure(go.Heatmap(
+                x=grid.input_axis, y=grid.calls_axis, z=grid.cost_surface((provider, current_model), avg_output_tokens),
+                colorscale='Reds', colorbar=dict(title='$'),
+                hovertemplate='$%{z:,.0f}/month<br>%{y:,.0f} calls · input %{x:,.0f}<extra></extra>',
+            ))
+            fig.add_trace(go.Scatter(x=[max(avg_input_tokens, 1)], y=[monthly_calls], mode='markers',
+                                     marker=dict(color='white', size=12, line=dict(color='black', width=2))))
+            fig.update_layout(height=350, xaxis=dict(type='log', title='Input tokens'),
+                              yaxis=dict(type='log', title='Monthly calls'), showlegend=False)
+            render_chart('cost_surface', fig)
+            
+            best = grid.best_alternative((provider, current_model), monthly_calls, avg_input_tokens, avg_output_tokens)
+            if best and best['savings'] > 0:
+                st.caption(f"Cheapest alternative here: {best['provider'].title()} {best['model']} "
+                           f"(${best['cost']:,.2f}/month, {best['savings_pct']:.0f}% less)")
 
 # TAB 2: Developer Tools
 with tab2:
@@ -136,22 +193,31 @@ with tab2:
 with tab3:
     st.header("📊 Your AI Cost Analysis")
     
+    profile_analysis = instrumentation.enabled() and st.checkbox("Profile this analysis (sampling profiler)")
+    
     if st.button("🎯 Analyse All Spending", type="primary", use_container_width=True):
         st.session_state.analysis_done = True
         
         with st.spinner("Analysing..."):
-            all_recommendations = []
-            
-            if monthly_calls > 0:
-                api_recs = optimize_api_usage(provider, current_model, monthly_calls, avg_input_tokens, avg_output_tokens, use_case)
-                all_recommendations.extend(api_recs)
-            
-            dev_recs = analyze_dev_tools(dev_tools_data)
-            all_recommendations.extend(dev_recs)
-            
-            summary = generate_summary_report(all_recommendations)
+            if profile_analysis:
+                # A fresh cache so the profile covers the full calculation
+                summary, profile = instrumentation.profile_run(
+                    cached_analysis, provider, current_model, monthly_calls, avg_input_tokens, avg_output_tokens,
+                    use_case, dev_tools_data, cache=LRUCache())
+                st.session_state.profile = profile
+            else:
+                summary = cached_analysis(provider, current_model, monthly_calls, avg_input_tokens, avg_output_tokens, use_case, dev_tools_data)
+                st.session_state.profile = None
             st.session_state.summary = summary
     
+    if st.session_state.get('profile'):
+        profile = st.session_state.profile
+        st.download_button(
+            f"⬇️ Download profile ({profile['samples']} samples, folded stacks)",
+            data=''.join(f'{stack} {n}\n' for stack, n in profile['stacks'].most_common()),
+            file_name='analysis.folded',
+        )
+    
     if st.session_state.analysis_done:
         summary = st.session_state.summary
         
@@ -176,7 +242,30 @@ with tab3:
             go.Bar(name='Optimised', x=['Cost'], y=[optimized], marker_color='#4ECDC4')
         ])
         fig.update_layout(height=300, showlegend=True)
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart('cost_comparison', fig)
+        
+        # 12-month forecast with growth and price uncertainty
+        if monthly_calls > 0:
+            current_api_cost = cached_api_cost(provider, current_model, monthly_calls, avg_input_tokens, avg_output_tokens)
+            best_api_savings = max((r['monthly_savings'] for r in summary['all_recommendations'] if 'category' not in r), default=0)
+            if current_api_cost > 0:
+                tables = active_pricing()
+                projection = forecast_spend(monthly_calls, avg_input_tokens, avg_output_tokens, {
+                    'current': model_config(tables, provider, current_model),
+                    'recommended': model_config(tables, provider, current_model, 1 - best_api_savings / current_api_cost),
+                }, months=12, scenarios=5000, seed=42)
+                
+                st.markdown("### 📈 12-Month API Spend Forecast")
+                fig = go.Figure()
+                for name, color, fill in [('current', '#FF6B6B', 'rgba(255,107,107,0.2)'), ('recommended', '#4ECDC4', 'rgba(78,205,196,0.2)')]:
+                    bands = projection[name]['monthly']
+                    fig.add_trace(go.Scatter(x=projection['months'], y=bands['p95'], line=dict(width=0), showlegend=False, hoverinfo='skip'))
+                    fig.add_trace(go.Scatter(x=projection['months'], y=bands['p5'], line=dict(width=0), fill='tonexty', fillcolor=fill, name=f'{name.title()} 5-95%'))
+                    fig.add_trace(go.Scatter(x=projection['months'], y=bands['p50'], line=dict(color=color), name=f'{name.title()} median'))
+                fig.update_layout(height=350, xaxis_title='Month', yaxis_title='Monthly cost ($)')
+                render_chart('forecast', fig)
+                savings_total = projection['savings']['total']
+                st.caption(f"12-month savings: ${savings_total['p50']:,.0f} median (90% range ${savings_total['p5']:,.0f}–${savings_total['p95']:,.0f}) across 5,000 growth and price scenarios")
         
         # Recommendations
         st.markdown("### 🎯 Top Recommendations")
@@ -334,6 +423,88 @@ with tab3:
         with col3:
             st.caption(" Money-back guarantee")
 
+# TAB 4: Portfolio
+with tab4:
+    st.header("📁 Portfolio Analysis")
+    st.markdown(f"Upload a CSV with one row per service: `{', '.join(PORTFOLIO_FIELDS)}`")
+    
+    uploaded = st.file_uploader("Portfolio CSV", type=['csv'])
+    if uploaded is not None and st.button("🎯 Analyse Portfolio", type="primary"):
+        workloads, errors = read_portfolio_csv(uploaded)
+        progress = {'done': 0, 'total': 0}
+        
+        def report(done, total):
+            # Called from the worker thread; only plain state is touched here
+            progress.update(done=done, total=total)
+        
+        st.session_state.portfolio = {
+            'future': submit_portfolio(workloads, progress=report),
+            'progress': progress,
+            'read_errors': errors,
+        }
+    
+    # Polls the background analysis without rerunning the whole page, only while it runs
+    job = st.session_state.get('portfolio')
+    pending = job is not None and not job['future'].done()
+    
+    @st.fragment(run_every=1 if pending else None)
+    def portfolio_results():
+        if job is None:
+            return
+        future = job['future']
+        if pending and future.done():
+            # A full rerun redefines the fragment without polling
+            st.rerun()
+        if not future.done():
+            progress = job['progress']
+            st.progress(progress['done'] / progress['total'] if progress['total'] else 0.0,
+                        text=f"Analysing {progress['done']}/{progress['total'] or '?'} unique workloads...")
+            return
+        result = future.result()
+        summary = result['summary']
+        errors = job['read_errors'] + result['errors']
+        if errors:
+            with st.expander(f"⚠️ {len(errors)} rows skipped"):
+                st.dataframe(errors, use_container_width=True)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Services", f"{summary['services']:,}", help=f"{summary['unique_workloads']:,} unique workload shapes")
+        with col2:
+            st.metric("Current Monthly", f"${summary['portfolio_monthly_cost']:,.0f}")
+        with col3:
+            st.metric("Potential Savings", f"${summary['portfolio_monthly_savings']:,.0f}",
+                      delta=f"-{summary['portfolio_savings_percentage']:.0f}%")
+        with col4:
+            st.metric("Annual Savings", f"${summary['portfolio_monthly_savings'] * 12:,.0f}")
+        
+        rows = sorted(result['rows'], key=lambda row: row['best_monthly_savings'], reverse=True)
+        top = rows[:20]
+        fig = go.Figure(data=[
+            go.Bar(name='Current', x=[row['service'] for row in top], y=[row['monthly_cost'] for row in top], marker_color='#FF6B6B'),
+            go.Bar(name='Optimised', x=[row['service'] for row in top],
+                   y=[row['monthly_cost'] - row['best_monthly_savings'] for row in top], marker_color='#4ECDC4'),
+        ])
+        fig.update_layout(height=350, title='Top 20 services by savings', yaxis_title='Monthly cost ($)')
+        render_chart('portfolio', fig)
+        
+        st.dataframe([{
+            'Service': row['service'],
+            'Provider': row['workload'].provider,
+            'Model': row['workload'].model,
+            'Monthly Cost': round(row['monthly_cost'], 2),
+            'Best Recommendation': row['best_recommendation'] or '—',
+            'Monthly Savings': round(row['best_monthly_savings'], 2),
+        } for row in rows], use_container_width=True)
+    
+    portfolio_results()
+
 # Footer
 st.divider()
-st.caption("💡 Pricing updated October 2025 | Results are estimates based on current published pricing")
\ No newline at end of file
+st.caption("💡 Pricing updated October 2025 | Results are estimates based on current published pricing")
+cache_stats = RESULT_CACHE.stats()
+st.caption(f"Result cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['size']} entries)")
+if instrumentation.enabled():
+    with st.expander("⏱️ Instrumentation"):
+        st.code(instrumentation.to_prometheus(), language='text')
+        st.json(instrumentation.snapshot())
@@ -0,0 +1,305 @@
+# benchmark.py
+"""Benchmark suite for the calculator hot paths
+
+    python benchmark.py --profile quick --output bench.json
+    python benchmark.py --profile full --baseline benchmark_baseline.json
+
+Each case records ops/sec, per-op latency percentiles and peak traced
+memory. With --baseline, cases whose ops/sec fell by more than the
+tolerance are reported and the exit status is 1.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from calculator import (
+    active_pricing,
+    install_pricing,
+    build_pricing_tables,
+    calculate_api_cost,
+    calculate_api_cost_batch,
+    calculate_api_cost_batch_exact,
+    find_cheapest_alternative,
+    optimize_api_usage,
+    analyze_dev_tools,
+    generate_summary_report
+)
+from pricing_data import DEV_TOOLS, TEAM_SUBS, USE_CASE_ROUTING
+from records import Recommendation
+
+PROFILES = {
+    'quick': {'workloads': [1_000, 100_000], 'catalogs': [30, 1_000], 'seats': [10_000], 'recommendations': [10_000]},
+    'full': {
+        'workloads': [1_000, 100_000, 1_000_000, 10_000_000],
+        'catalogs': [30, 1_000, 10_000],
+        'seats': [10_000],
+        'recommendations': [10_000, 1_000_000],
+    },
+}
+TIERS = ('ultra-budget', 'budget', 'mid', 'premium')
+SAMPLE_CALLS = 2_000
+# Batch cases price at most this many workload x model cells at once (~80 MB
+# of float64) and skip, with a recorded reason, ops larger than MAX_CELLS
+CHUNK_CELLS = 10_000_000
+MAX_CELLS = 1_000_000_000
+
+def make_catalog(n_models, seed=0):
+    """Synthetic API_PRICING with n_models spread over providers"""
+    rng = random.Random(seed)
+    n_providers = max(1, n_models // 50)
+    catalog = {f'provider-{p}': {} for p in range(n_providers)}
+    for i in range(n_models):
+        input_price = round(10 ** rng.uniform(-2, 1.3), 4)
+        catalog[f'provider-{i % n_providers}'][f'model-{i}'] = {
+            'input': input_price,
+            'output': round(input_price * rng.uniform(2, 6), 4),
+            'context': rng.choice([16_385, 64_000, 128_000, 200_000, 1_000_000]),
+            'tier': rng.choice(TIERS),
+        }
+    return catalog
+
+def make_workloads(n, seed=0):
+    """Synthetic workloads as columns: monthly calls and average input/output tokens"""
+    rng = np.random.default_rng(seed)
+    return {
+        'monthly_calls': rng.integers(1_000, 10_000_000, n),
+        'avg_input_tokens': rng.lognormal(6.5, 1.2, n).round(),
+        'avg_output_tokens': rng.lognormal(5.5, 1.0, n).round(),
+    }
+
+def make_dev_tools_usage(n_seats, seed=0):
+    """Dev-tool seat map with n_seats spread over every tool"""
+    rng = random.Random(seed)
+    tools = list(DEV_TOOLS)
+    usage = {}
+    for i, tool in enumerate(tools):
+        total = n_seats // len(tools) + (i < n_seats % len(tools))
+        usage[tool] = {'total_seats': total, 'active_seats': int(total * rng.uniform(0.4, 1.0))}
+    return usage
+
+def make_recommendations(n, seed=0, records=False):
+    """Switch recommendations shaped like optimize_api_usage output, as dicts or Recommendation records"""
+    rng = random.Random(seed)
+    models = [('deepseek', 'deepseek-v3.2-exp'), ('google', 'gemini-2.5-flash'), ('mistral', 'mistral-medium-3')]
+    recommendations = []
+    for i in range(n):
+        current = rng.uniform(10, 100_000)
+        savings = current * rng.uniform(0.05, 0.9)
+        provider, model = models[i % len(models)]
+        if records:
+            recommendations.append(Recommendation('switch', current, current - savings, savings, provider, model))
+            continue
+        recommendations.append({
+            'title': f'Switch to {provider.title()} {model}',
+            'description': f'Save {(savings / current) * 100:.0f}% by switching providers',
+            'current_cost': current,
+            'optimized_cost': current - savings,
+            'monthly_savings': savings,
+            'annual_savings': savings * 12,
+            'effort': 'Low',
+            'implementation': f'1. Sign up for {provider.title()} API\n2. Update API endpoint\n'
+                              f'3. Test with 10% of traffic\n4. Monitor quality\n5. Scale to 100%',
+        })
+    return recommendations
+
+def measure(name, fn, calls, params=None, items_per_call=1):
+    """Time fn over a list of argument tuples; one call is one op"""
+    latencies = np.empty(len(calls))
+    tracemalloc.start()
+    started = time.perf_counter()
+    for k, args in enumerate(calls):
+        t0 = time.perf_counter()
+        fn(*args)
+        latencies[k] = time.perf_counter() - t0
+    elapsed = time.perf_counter() - started
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # tracemalloc slows allocation-heavy code, so throughput is re-timed untraced
+    started = time.perf_counter()
+    for args in calls:
+        fn(*args)
+    untraced = time.perf_counter() - started
+    us = latencies * 1e6
+    return {
+        'name': name,
+        'params': params or {},
+        'ops': len(calls),
+        'ops_per_sec': len(calls) / untraced if untraced else 0,
+        'items_per_sec': len(calls) * items_per_call / untraced if untraced else 0,
+        'latency_us': {
+            'p50': float(np.percentile(us, 50)),
+            'p90': float(np.percentile(us, 90)),
+            'p99': float(np.percentile(us, 99)),
+            'max': float(us.max()),
+        },
+        'traced_seconds': elapsed,
+        'peak_memory_kb': peak / 1024,
+    }
+
+def _scalar_calls(workloads, model_keys, limit, with_use_case=False):
+    n = min(limit, len(workloads['monthly_calls']))
+    calls = []
+    for k in range(n):
+        provider, model = model_keys[k % len(model_keys)]
+        args = (provider, model, int(workloads['monthly_calls'][k]),
+                float(workloads['avg_input_tokens'][k]), float(workloads['avg_output_tokens'][k]))
+        calls.append(args + ('customer_support',) if with_use_case else args)
+    return calls
+
+def _chunked(fn, n_models):
+    """fn over row chunks of its column arguments, so no chunk exceeds CHUNK_CELLS cells"""
+    rows = max(1, CHUNK_CELLS // n_models)
+
+    def run(*columns):
+        for start in range(0, len(columns[0]), rows):
+            fn(*(column[start:start + rows] for column in columns))
+    return run
+
+def skipped(name, params, reason):
+    """Result row for a case that was not run"""
+    return {'name': name, 'params': params, 'skipped': reason}
+
+def _streaming_summary(recommendations):
+    return generate_summary_report(iter(recommendations), top_k=5, keep_all=False)
+
+def run_suite(profile='quick', seed=0):
+    """Run every benchmark case of a profile"""
+    config = PROFILES[profile]
+    results = []
+    original = active_pricing()
+    try:
+        for n_models in config['catalogs']:
+            install_pricing(build_pricing_tables(make_catalog(n_models, seed), DEV_TOOLS, TEAM_SUBS,
+                                                 USE_CASE_ROUTING, f'bench-{n_models}'))
+            model_keys = active_pricing()['catalog'].model_keys
+            workloads = make_workloads(SAMPLE_CALLS, seed)
+            params = {'models': n_models}
+            results.append(measure('calculate_api_cost', calculate_api_cost,
+                                   _scalar_calls(workloads, model_keys, SAMPLE_CALLS), params))
+            results.append(measure('find_cheapest_alternative', find_cheapest_alternative,
+                                   _scalar_calls(workloads, model_keys, SAMPLE_CALLS // 4), params))
+            results.append(measure('optimize_api_usage', optimize_api_usage,
+                                   _scalar_calls(workloads, model_keys, SAMPLE_CALLS // 4, True), params))
+            for n_workloads in config['workloads']:
+                params = {'models': n_models, 'workloads': n_workloads}
+                cells = n_workloads * n_models
+                if cells > MAX_CELLS:
+                    reason = f'{cells:,} cells per op exceeds MAX_CELLS ({MAX_CELLS:,})'
+                    results.append(skipped('calculate_api_cost_batch', params, reason))
+                    results.append(skipped('calculate_api_cost_batch_exact', params, reason))
+                    continue
+                # Large batches are priced in chunks and timed once, as a caller streaming them would
+                repeats = 3 if cells <= CHUNK_CELLS * 10 else 1
+                batch = make_workloads(n_workloads, seed)
+                results.append(measure(
+                    'calculate_api_cost_batch', _chunked(calculate_api_cost_batch, n_models),
+                    [(batch['monthly_calls'], batch['avg_input_tokens'], batch['avg_output_tokens'])] * repeats,
+                    params, items_per_call=cells,
+                ))
+                input_totals = np.rint(batch['monthly_calls'] * batch['avg_input_tokens']).astype(np.int64)
+                output_totals = np.rint(batch['monthly_calls'] * batch['avg_output_tokens']).astype(np.int64)
+                del batch
+                results.append(measure(
+                    'calculate_api_cost_batch_exact', _chunked(calculate_api_cost_batch_exact, n_models),
+                    [(input_totals, output_totals)] * repeats, params, items_per_call=cells,
+                ))
+                del input_totals, output_totals
+    finally:
+        install_pricing(original)
+
+    for n_seats in config['seats']:
+        usage = make_dev_tools_usage(n_seats, seed)
+        results.append(measure('analyze_dev_tools', analyze_dev_tools, [(usage,)] * 200, {'seats': n_seats}))
+    for n_recommendations in config['recommendations']:
+        recommendations = make_recommendations(n_recommendations, seed)
+        results.append(measure('generate_summary_report', generate_summary_report, [(recommendations,)] * 5,
+                               {'recommendations': n_recommendations}, items_per_call=n_recommendations))
+        records = make_recommendations(n_recommendations, seed, records=True)
+        results.append(measure('generate_summary_report', generate_summary_report, [(records,)] * 5,
+                               {'recommendations': n_recommendations, 'records': 'slots'},
+                               items_per_call=n_recommendations))
+        results.append(measure('generate_summary_report', _streaming_summary, [(records,)] * 5,
+                               {'recommendations': n_recommendations, 'records': 'slots', 'streaming': True},
+                               items_per_call=n_recommendations))
+        del recommendations, records
+        # Building the list is where dicts of pre-rendered strings cost time and memory
+        for kind, as_records in (('dict', False), ('slots', True)):
+            results.append(measure('build_recommendations', make_recommendations,
+                                   [(n_recommendations, seed, as_records)] * 3,
+                                   {'recommendations': n_recommendations, 'records': kind},
+                                   items_per_call=n_recommendations))
+    return results
+
+def _case_key(result):
+    return result['name'] + json.dumps(result['params'], sort_keys=True)
+
+def find_regressions(results, baseline, tolerance=0.2):
+    """Cases whose ops/sec fell more than tolerance below the baseline"""
+    previous = {_case_key(r): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        before = previous.get(_case_key(result))
+        if 'skipped' in result or not before or 'skipped' in before:
+            continue
+        if result['ops_per_sec'] < before['ops_per_sec'] * (1 - tolerance):
+            regressions.append({
+                'name': result['name'],
+                'params': result['params'],
+                'baseline_ops_per_sec': before['ops_per_sec'],
+                'ops_per_sec': result['ops_per_sec'],
+                'change_pct': (result['ops_per_sec'] / before['ops_per_sec'] - 1) * 100,
+            })
+    return regressions
+
+def format_table(results):
+    lines = [f'{"case":<52} {"ops/sec":>12} {"p50 us":>10} {"p99 us":>10} {"peak KB":>10}']
+    for r in results:
+        case = r['name'] + ''.join(f' {k}={v}' for k, v in r['params'].items())
+        if 'skipped' in r:
+            lines.append(f'{case:<52} skipped: {r["skipped"]}')
+            continue
+        # Chunked multi-million-workload batches run well under one op per second
+        ops = f'{r["ops_per_sec"]:,.0f}' if r['ops_per_sec'] >= 100 else f'{r["ops_per_sec"]:,.3f}'
+        lines.append(f'{case:<52} {ops:>12} {r["latency_us"]["p50"]:>10,.1f} '
+                     f'{r["latency_us"]["p99"]:>10,.1f} {r["peak_memory_kb"]:>10,.0f}')
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark calculator hot paths')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--baseline', help='compare against a stored results JSON')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed ops/sec drop (0.2 = 20%%)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.profile, args.seed)
+    report = {
+        'profile': args.profile,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    print(format_table(results))
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = find_regressions(results, json.load(handle), args.tolerance)
+        for r in regressions:
+            print(f'REGRESSION {r["name"]} {r["params"]}: {r["ops_per_sec"]:,.0f} ops/sec '
+                  f'({r["change_pct"]:+.0f}% vs baseline)', file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+# cache_simulator.py
+"""Request-level prompt-cache and batch-eligibility replay
+
+Logs carry the usage_logs fields plus:
+    prompt_hash     hash of the cacheable prompt prefix (hex string or int)
+    prefix_tokens   tokens in that shared prefix
+    batch_eligible  true if the request could have gone through a batch API
+
+The cache holds one 64-bit integer key per cached prefix, scoped to its
+model, so memory is bounded by the cache capacity however long the replay.
+"""
+import csv
+import hashlib
+import json
+from collections import OrderedDict
+from itertools import islice
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 100_000
+_KEY_MASK = (1 << 64) - 1
+
+def prompt_key(value):
+    """64-bit integer key for a prompt hash: hex digests are truncated, anything else is hashed"""
+    if value is None or value == '':
+        return 0
+    if isinstance(value, int):
+        return value & _KEY_MASK or 1
+    text = str(value)
+    try:
+        return int(text[:16], 16) or 1
+    except ValueError:
+        return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'little') or 1
+
+def _truthy(value):
+    return value in (True, 1) or str(value).lower() in ('true', '1', 'yes')
+
+def _timestamp(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        from datetime import datetime
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+def _columns(rows, model_index):
+    """Convert parsed rows to compact NumPy columns; unknown models are dropped"""
+    kept = [r for r in rows if (r[0], r[1]) in model_index]
+    n = len(kept)
+    return {
+        'model': np.fromiter((model_index[(r[0], r[1])] for r in kept), dtype=np.int32, count=n),
+        'input_tokens': np.fromiter((r[2] for r in kept), dtype=np.int64, count=n),
+        'output_tokens': np.fromiter((r[3] for r in kept), dtype=np.int64, count=n),
+        'timestamp': np.fromiter((r[4] for r in kept), dtype=np.float64, count=n),
+        'prompt_key': np.fromiter((r[5] for r in kept), dtype=np.uint64, count=n),
+        'prefix_tokens': np.fromiter((r[6] for r in kept), dtype=np.int64, count=n),
+        'batch_eligible': np.fromiter((r[7] for r in kept), dtype=bool, count=n),
+    }, len(rows) - n
+
+def _row(get):
+    input_tokens = int(get('input_tokens') or 0)
+    return (
+        get('provider'), get('model'), input_tokens, int(get('output_tokens') or 0),
+        _timestamp(get('timestamp')), prompt_key(get('prompt_hash')),
+        min(int(get('prefix_tokens') or 0), input_tokens), _truthy(get('batch_eligible')),
+    )
+
+def iter_request_chunks(path, model_index, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (columns, skipped) chunks from a JSONL or CSV request log, in log order"""
+    with open(path, 'r', encoding='utf-8', newline='') as stream:
+        reader = csv.DictReader(stream) if path.lower().endswith('.csv') else None
+        source = reader if reader is not None else stream
+        while True:
+            lines = list(islice(source, chunk_size))
+            if not lines:
+                return
+            rows, bad = [], 0
+            for line in lines:
+                try:
+                    record = line if reader is not None else json.loads(line)
+                    rows.append(_row(record.get))
+                except (ValueError, TypeError, AttributeError):
+                    bad += 1
+            columns, unknown = _columns(rows, model_index)
+            yield columns, bad + unknown
+
+class PrefixCache:
+    """Bounded prefix cache of integer keys with LRU eviction and an optional TTL
+
+    policy='lru' evicts the least recently used key once capacity is
+    reached; policy='ttl' additionally expires keys ttl seconds after their
+    last use, like provider-side prompt caches.
+    """
+
+    def __init__(self, capacity=100_000, policy='lru', ttl=300.0):
+        if policy not in ('lru', 'ttl'):
+            raise ValueError(f'Unknown cache policy {policy!r}')
+        self.capacity = capacity
+        self.policy = policy
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> last use time
+        self.evictions = 0
+        self.expirations = 0
+
+    def access(self, key, now):
+        """Record a request for key; returns True on a cache hit"""
+        entries = self._entries
+        last_used = entries.get(key)
+        if last_used is not None:
+            if self.policy == 'ttl' and now - last_used > self.ttl:
+                self.expirations += 1
+            else:
+                entries[key] = now
+                entries.move_to_end(key)
+                return True
+        entries[key] = now
+        entries.move_to_end(key)
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return False
+
+    def __len__(self):
+        return len(self._entries)
+
+def replay(chunks, n_models, capacity=100_000, policy='lru', ttl=300.0):
+    """Replay request chunks through a PrefixCache; returns per-model integer counters"""
+    cache = PrefixCache(capacity, policy, ttl)
+    counters = {name: np.zeros(n_models, dtype=np.int64) for name in (
+        'requests', 'cacheable_requests', 'hits', 'input_tokens', 'output_tokens',
+        'cached_tokens', 'write_tokens', 'batch_requests', 'batch_input_tokens', 'batch_output_tokens')}
+    skipped = 0
+    access = cache.access
+    for columns, bad in chunks:
+        skipped += bad
+        model = columns['model']
+        counters['requests'] += np.bincount(model, minlength=n_models)
+        counters['input_tokens'] += np.bincount(model, columns['input_tokens'], n_models).astype(np.int64)
+        counters['output_tokens'] += np.bincount(model, columns['output_tokens'], n_models).astype(np.int64)
+        batch = columns['batch_eligible']
+        counters['batch_requests'] += np.bincount(model[batch], minlength=n_models)
+        counters['batch_input_tokens'] += np.bincount(
+            model[batch], columns['input_tokens'][batch], n_models).astype(np.int64)
+        counters['batch_output_tokens'] += np.bincount(
+            model[batch], columns['output_tokens'][batch], n_models).astype(np.int64)
+
+        cacheable = np.flatnonzero((columns['prompt_key'] != 0) & (columns['prefix_tokens'] > 0))
+        if not len(cacheable):
+            continue
+        # Cache keys are scoped per model: providers cache per model
+        keys = ((columns['prompt_key'][cacheable] * np.uint64(1_000_003)) ^ model[cacheable].astype(np.uint64)).tolist()
+        times = columns['timestamp'][cacheable].tolist()
+        hit = np.fromiter((access(k, t) for k, t in zip(keys, times)), dtype=bool, count=len(keys))
+        cached_model = model[cacheable]
+        prefix = columns['prefix_tokens'][cacheable]
+        counters['cacheable_requests'] += np.bincount(cached_model, minlength=n_models)
+        counters['hits'] += np.bincount(cached_model[hit], minlength=n_models)
+        counters['cached_tokens'] += np.bincount(cached_model[hit], prefix[hit], n_models).astype(np.int64)
+        counters['write_tokens'] += np.bincount(cached_model[~hit], prefix[~hit], n_models).astype(np.int64)
+    return {'counters': counters, 'skipped': skipped, 'evictions': cache.evictions,
+            'expirations': cache.expirations, 'cache_entries': len(cache)}
+
+def price_simulation(counters, tables):
+    """Per-model measured caching and batch savings at per-provider discount rates"""
+    model_keys = tables['catalog'].model_keys
+    prices = tables['price_matrix']['prices']
+    results = {}
+    for i in np.flatnonzero(counters['requests']):
+        provider, model = model_keys[i]
+        caching = tables['prompt_caching'].get(provider, {})
+        batch_discount = tables['batch_discounts'].get(provider, 0.0)
+        input_price, output_price = float(prices[0, i]), float(prices[1, i])
+        cost = (int(counters['input_tokens'][i]) / 1_000_000) * input_price \
+            + (int(counters['output_tokens'][i]) / 1_000_000) * output_price
+        caching_savings = (
+            int(counters['cached_tokens'][i]) * caching.get('read_discount', 0.0)
+            - int(counters['write_tokens'][i]) * caching.get('write_premium', 0.0)
+        ) / 1_000_000 * input_price
+        batch_cost = (int(counters['batch_input_tokens'][i]) / 1_000_000) * input_price \
+            + (int(counters['batch_output_tokens'][i]) / 1_000_000) * output_price
+        cacheable = int(counters['cacheable_requests'][i])
+        results[(provider, model)] = {
+            'requests': int(counters['requests'][i]),
+            'hit_rate': int(counters['hits'][i]) / cacheable if cacheable else 0.0,
+            'cached_token_share': int(counters['cached_tokens'][i]) / max(int(counters['input_tokens'][i]), 1),
+            'batch_request_share': int(counters['batch_requests'][i]) / int(counters['requests'][i]),
+            'cost': cost,
+            'caching_savings': max(caching_savings, 0.0),
+            'caching_discount': caching.get('read_discount', 0.0),
+            'batch_savings': batch_cost * batch_discount,
+            'batch_discount': batch_discount,
+        }
+    return results
+
+def simulate_log(path, capacity=100_000, policy='lru', ttl=300.0, chunk_size=DEFAULT_CHUNK_SIZE, tables=None):
+    """Replay a request log and price the measured cache hits and batch-eligible traffic"""
+    if tables is None:
+        from calculator import active_pricing
+        tables = active_pricing()
+    index = tables['catalog'].index
+    result = replay(iter_request_chunks(path, index, chunk_size), len(index), capacity, policy, ttl)
+    counters = result.pop('counters')
+    requests = int(counters['requests'].sum())
+    cacheable = int(counters['cacheable_requests'].sum())
+    result.update({
+        'requests': requests,
+        'hit_rate': int(counters['hits'].sum()) / cacheable if cacheable else 0.0,
+        'models': price_simulation(counters, tables),
+    })
+    return result
@@ -1,95 +1,259 @@
 # calculator.py
 """Core calculation logic"""
-from pricing_data import API_PRICING, DEV_TOOLS, USE_CASE_ROUTING
+import heapq
+import itertools
 
+from instrumentation import instrumented
+from pricing_catalog import PricingCatalog
+from pricing_data import (
+    API_PRICING, DEV_TOOLS, TEAM_SUBS, USE_CASE_ROUTING, PROMPT_CACHING, BATCH_DISCOUNTS, PRICING_VERSION
+)
+from records import Recommendation
+from routing import optimize_routing, routing_recommendation
+
+def build_price_matrix(api_pricing):
+    """Flatten nested pricing into a contiguous (2, n_models) price matrix"""
+    # numpy is imported lazily so scalar-only callers (CLI, service) start fast
+    import numpy as np
+    model_keys = [(provider, model) for provider, models in api_pricing.items() for model in models]
+    prices = np.array(
+        [[api_pricing[p][m]['input'] for p, m in model_keys],
+         [api_pricing[p][m]['output'] for p, m in model_keys]],
+        dtype=np.float64,
+    )
+    return {
+        'model_keys': model_keys,
+        'index': {key: i for i, key in enumerate(model_keys)},
+        'prices': np.ascontiguousarray(prices),
+        'contexts': np.array([api_pricing[p][m]['context'] for p, m in model_keys], dtype=np.float64),
+    }
+
+# Serial numbers of built table sets
+_TABLE_SERIALS = itertools.count(1)
+
+class _PricingTables(dict):
+    """Pricing tables dict that builds its NumPy price matrices on first access
+
+    serial identifies the table set, so caches can tell apart two sets that
+    share a version tag (a pricing file edited without bumping its version).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.serial = next(_TABLE_SERIALS)
+
+    def __missing__(self, key):
+        if key == 'price_matrix':
+            value = build_price_matrix(self['api_pricing'])
+        elif key == 'exact_prices':
+            from money import build_exact_prices
+            value = build_exact_prices(self['api_pricing'])
+        else:
+            raise KeyError(key)
+        # Concurrent first accesses may both build it; the results are identical
+        self[key] = value
+        return value
+
+def build_pricing_tables(api_pricing, dev_tools, team_subs, use_case_routing, version,
+                         prompt_caching=None, batch_discounts=None):
+    """Bundle one version of the pricing tables with its derived price matrix and catalog"""
+    return _PricingTables(
+        version=version,
+        api_pricing=api_pricing,
+        dev_tools=dev_tools,
+        team_subs=team_subs,
+        use_case_routing=use_case_routing,
+        prompt_caching=PROMPT_CACHING if prompt_caching is None else prompt_caching,
+        batch_discounts=BATCH_DISCOUNTS if batch_discounts is None else batch_discounts,
+        catalog=PricingCatalog(api_pricing),
+    )
+
+_PRICING = build_pricing_tables(API_PRICING, DEV_TOOLS, TEAM_SUBS, USE_CASE_ROUTING, PRICING_VERSION)
+
+def active_pricing():
+    """Pricing tables used by calculations started from now on"""
+    return _PRICING
+
+def install_pricing(tables):
+    """Swap in new pricing tables; in-flight calculations keep the tables they started with"""
+    global _PRICING
+    _PRICING = tables
+
+# Minimum share of input tokens in long prompts before caching is suggested
+LONG_PROMPT_MIN_SHARE = 0.10
+
+@instrumented('calculator.calculate_api_cost')
 def calculate_api_cost(provider, model, monthly_calls, avg_input_tokens, avg_output_tokens):
     """Calculate monthly cost for API usage"""
-    pricing = API_PRICING[provider][model]
+    pricing = _PRICING['api_pricing'][provider][model]
     input_cost = (monthly_calls * avg_input_tokens / 1_000_000) * pricing['input']
     output_cost = (monthly_calls * avg_output_tokens / 1_000_000) * pricing['output']
     return input_cost + output_cost
 
+def calculate_api_cost_batch(monthly_calls, avg_input_tokens, avg_output_tokens, price_matrix=None):
+    """Calculate monthly cost of every workload on every model (workloads x models)"""
+    import numpy as np
+    price_matrix = price_matrix or _PRICING['price_matrix']
+    calls = np.asarray(monthly_calls, dtype=np.float64).reshape(-1)
+    input_tokens = np.asarray(avg_input_tokens, dtype=np.float64).reshape(-1)
+    output_tokens = np.asarray(avg_output_tokens, dtype=np.float64).reshape(-1)
+    # Same operation order as calculate_api_cost so results match bit for bit
+    input_volume = (calls * input_tokens / 1_000_000)[:, None]
+    output_volume = (calls * output_tokens / 1_000_000)[:, None]
+    prices = price_matrix['prices']
+    return input_volume * prices[0] + output_volume * prices[1]
+
+def calculate_api_cost_exact(provider, model, monthly_calls, avg_input_tokens, avg_output_tokens):
+    """Calculate monthly cost for API usage as exact Decimal dollars, rounded once to the cent
+
+    Token counts are rounded to whole tokens and priced in integer
+    nano-cents (see money.py), so the result matches an invoice line.
+    """
+    from money import cents_to_dollars, price_to_nanocents, to_cents, token_count
+    pricing = _PRICING['api_pricing'][provider][model]
+    nanocents = (token_count(monthly_calls, avg_input_tokens) * price_to_nanocents(pricing['input'])
+                 + token_count(monthly_calls, avg_output_tokens) * price_to_nanocents(pricing['output']))
+    return cents_to_dollars(to_cents(nanocents))
+
+def calculate_api_cost_batch_exact(input_tokens, output_tokens, exact_prices=None):
+    """Exact nano-cent cost of integer token totals on every model (workloads x models)
+
+    Use money.to_cents to round the result. Runs in int64 unless a
+    product could overflow, in which case it falls back to Python ints.
+    """
+    import numpy as np
+    from money import token_costs
+    exact_prices = exact_prices or _PRICING['exact_prices']
+    prices = exact_prices['prices']
+    input_tokens = np.asarray(input_tokens).reshape(-1, 1)
+    output_tokens = np.asarray(output_tokens).reshape(-1, 1)
+    return token_costs(input_tokens, output_tokens, prices[0], prices[1])
+
+def catalog_alternatives(current_cost, input_volume, output_volume, catalog=None, min_context=0, limit=3):
+    """Top alternatives cheaper than current_cost from an indexed catalog query"""
+    catalog = catalog or _PRICING['catalog']
+    k = limit + 1
+    while True:
+        ranked = catalog.top_k_cheapest(input_volume, output_volume, k, min_context=min_context)
+        # Savings are rounded differences, so distinct costs can tie on
+        # savings; widen the query until the cut-off is unambiguous
+        if len(ranked) < k or current_cost - ranked[-1][0] != current_cost - ranked[limit - 1][0]:
+            break
+        k *= 2
+    cheaper = [(current_cost - cost, i, cost) for cost, i in ranked if cost < current_cost]
+    cheaper.sort(key=lambda x: (-x[0], x[1]))
+    alternatives = []
+    for savings, i, cost in cheaper[:limit]:
+        alt_provider, alt_model = catalog.model_keys[i]
+        alternatives.append({
+            'provider': alt_provider,
+            'model': alt_model,
+            'cost': cost,
+            'savings': savings,
+            'savings_pct': (savings / current_cost) * 100,
+        })
+    return alternatives
+
+@instrumented('calculator.find_cheapest_alternative')
 def find_cheapest_alternative(provider, model, monthly_calls, avg_input_tokens, avg_output_tokens):
     """Find cheapest model across all providers"""
-    current_cost = calculate_api_cost(provider, model, monthly_calls, avg_input_tokens, avg_output_tokens)
-    alternatives = []
-    
-    for alt_provider, models in API_PRICING.items():
-        for alt_model, pricing in models.items():
-            alt_cost = calculate_api_cost(alt_provider, alt_model, monthly_calls, avg_input_tokens, avg_output_tokens)
-            if alt_cost < current_cost:
-                savings_pct = ((current_cost - alt_cost) / current_cost) * 100
-                alternatives.append({
-                    'provider': alt_provider,
-                    'model': alt_model,
-                    'cost': alt_cost,
-                    'savings': current_cost - alt_cost,
-                    'savings_pct': savings_pct,
-                })
-    
-    alternatives.sort(key=lambda x: x['savings'], reverse=True)
-    return alternatives[:3]
+    input_volume = monthly_calls * avg_input_tokens / 1_000_000
+    output_volume = monthly_calls * avg_output_tokens / 1_000_000
+    catalog = _PRICING['catalog']
+    current_cost = catalog.cost(catalog.index[(provider, model)], input_volume, output_volume)
+    return catalog_alternatives(current_cost, input_volume, output_volume, catalog)
 
-def optimize_api_usage(provider, current_model, monthly_calls, avg_input_tokens, avg_output_tokens, use_case):
-    """Suggest optimizations"""
+@instrumented('calculator.optimize_api_usage')
+def optimize_api_usage(provider, current_model, monthly_calls, avg_input_tokens, avg_output_tokens, use_case,
+                       token_distribution=None, max_overflow=0.001, cache_simulation=None):
+    """Suggest optimizations
+
+    With a token_distribution, its exact means replace the average token
+    arguments, models whose context window more than max_overflow of the
+    requests would overflow are never suggested, and prompt caching is
+    sized by the share of input tokens sent in long prompts.
+
+    With a cache_simulation (from cache_simulator.simulate_log), caching
+    and batch savings come from the replayed hit rate and batch-eligible
+    share at the provider's discount rates instead of flat estimates.
+    """
     recommendations = []
-    current_cost = calculate_api_cost(provider, current_model, monthly_calls, avg_input_tokens, avg_output_tokens)
+    pricing = _PRICING
+    if token_distribution is not None:
+        avg_input_tokens = token_distribution.mean_input
+        avg_output_tokens = token_distribution.mean_output
+    input_volume = monthly_calls * avg_input_tokens / 1_000_000
+    output_volume = monthly_calls * avg_output_tokens / 1_000_000
+    catalog = pricing['catalog']
+    current_cost = catalog.cost(catalog.index[(provider, current_model)], input_volume, output_volume)
     
     # Find cheaper alternatives
-    alternatives = find_cheapest_alternative(provider, current_model, monthly_calls, avg_input_tokens, avg_output_tokens)
+    min_context = 0
+    if token_distribution is not None:
+        min_context = token_distribution.quantile(1 - max_overflow, 'total')
+    alternatives = catalog_alternatives(current_cost, input_volume, output_volume, catalog, min_context)
     
     if alternatives and alternatives[0]['savings'] > current_cost * 0.30:
         alt = alternatives[0]
-        recommendations.append({
-            'title': f'Switch to {alt["provider"].title()} {alt["model"]}',
-            'description': f'Save {alt["savings_pct"]:.0f}% by switching providers',
-            'current_cost': current_cost,
-            'optimized_cost': alt['cost'],
-            'monthly_savings': alt['savings'],
-            'annual_savings': alt['savings'] * 12,
-            'effort': 'Low',
-            'implementation': f'1. Sign up for {alt["provider"].title()} API\n2. Update API endpoint\n3. Test with 10% of traffic\n4. Monitor quality\n5. Scale to 100%'
-        })
+        recommendations.append(Recommendation(
+            'switch', current_cost, alt['cost'], alt['savings'], alt['provider'], alt['model']
+        ))
+    
+    # Tiered routing across the use case's complexity split
+    routing = pricing['use_case_routing'].get(use_case)
+    if routing:
+        routed = optimize_routing(catalog, routing, monthly_calls, avg_input_tokens, avg_output_tokens, min_context)
+        recommendation = routing_recommendation(use_case, current_cost, routed)
+        if recommendation:
+            recommendations.append(recommendation)
+    
+    simulated = cache_simulation['models'].get((provider, current_model)) if cache_simulation else None
     
     # Prompt caching recommendation
-    if avg_input_tokens > 1000:
+    if simulated is not None:
+        if simulated['caching_savings'] > 0 and simulated['cost'] > 0:
+            caching_savings = current_cost * simulated['caching_savings'] / simulated['cost']
+            recommendations.append(Recommendation(
+                'caching_measured', current_cost, current_cost - caching_savings, caching_savings,
+                simulated['hit_rate'], simulated['caching_discount']
+            ))
+    elif token_distribution is not None:
+        long_prompt_share = token_distribution.input_share_above(1000)
+        if long_prompt_share >= LONG_PROMPT_MIN_SHARE:
+            caching_savings = current_cost * 0.30 * long_prompt_share
+            recommendations.append(Recommendation(
+                'caching_long_prompts', current_cost, current_cost - caching_savings, caching_savings,
+                long_prompt_share
+            ))
+    elif avg_input_tokens > 1000:
         caching_savings = current_cost * 0.30
-        recommendations.append({
-            'title': 'Enable prompt caching',
-            'description': 'Cache repeated prompts to reduce costs 30-50%',
-            'current_cost': current_cost,
-            'optimized_cost': current_cost - caching_savings,
-            'monthly_savings': caching_savings,
-            'annual_savings': caching_savings * 12,
-            'effort': 'Low',
-            'implementation': 'Add caching parameters to API calls. Typical savings: 30-50%'
-        })
+        recommendations.append(Recommendation('caching', current_cost, current_cost - caching_savings, caching_savings))
     
     # Batch processing
-    if monthly_calls > 100000:
+    if simulated is not None:
+        if simulated['batch_savings'] > 0 and simulated['cost'] > 0:
+            batch_savings = current_cost * simulated['batch_savings'] / simulated['cost']
+            recommendations.append(Recommendation(
+                'batch_measured', current_cost, current_cost - batch_savings, batch_savings,
+                simulated['batch_discount'], simulated['batch_request_share']
+            ))
+    elif monthly_calls > 100000:
         batch_savings = current_cost * 0.25
-        recommendations.append({
-            'title': 'Use Batch API (50% discount)',
-            'description': 'Process non-urgent tasks overnight',
-            'current_cost': current_cost,
-            'optimized_cost': current_cost - batch_savings,
-            'monthly_savings': batch_savings,
-            'annual_savings': batch_savings * 12,
-            'effort': 'Medium',
-            'implementation': 'Identify non-urgent tasks and submit as batch jobs'
-        })
+        recommendations.append(Recommendation('batch', current_cost, current_cost - batch_savings, batch_savings))
     
     return recommendations
 
+@instrumented('calculator.analyze_dev_tools')
 def analyze_dev_tools(tools_usage):
     """Analyze developer tool spending"""
     recommendations = []
+    dev_tools = _PRICING['dev_tools']
     
     for tool, usage in tools_usage.items():
         if usage['total_seats'] == 0:
             continue
         
-        tool_pricing = DEV_TOOLS.get(tool, {})
+        tool_pricing = dev_tools.get(tool, {})
         if not tool_pricing:
             continue
         
@@ -101,42 +265,82 @@ def analyze_dev_tools(tools_usage):
             wasted_seats = usage['total_seats'] - active_seats
             savings = wasted_seats * price_per_seat
             
-            recommendations.append({
-                'category': 'Developer Tools',
-                'title': f'Remove {wasted_seats} unused {tool.replace("_", " ").title()} seats',
-                'description': f'Only {active_seats} of {usage["total_seats"]} seats active',
-                'current_cost': current_cost,
-                'optimized_cost': active_seats * price_per_seat,
-                'monthly_savings': savings,
-                'annual_savings': savings * 12,
-                'effort': 'Low',
-                'implementation': f'Review usage logs and remove inactive users'
-            })
+            recommendations.append(Recommendation(
+                'dev_seats', current_cost, active_seats * price_per_seat, savings,
+                tool, wasted_seats, active_seats, usage['total_seats']
+            ))
     
     return recommendations
 
-def generate_summary_report(all_recommendations):
-    """Generate summary of all recommendations"""
-    if not all_recommendations:
-        return {
-            'total_monthly_cost': 0,
-            'total_annual_cost': 0,
-            'total_monthly_savings': 0,
-            'total_annual_savings': 0,
-            'savings_percentage': 0,
-            'top_recommendations': [],
-            'all_recommendations': []
+def _offer(heap, k, savings, order, rec):
+    """Keep the k largest (savings, -order) entries in a min-heap"""
+    if len(heap) < k:
+        heapq.heappush(heap, (savings, -order, rec))
+    # Later records lose ties, like a stable sort, so only strictly larger savings displace the minimum
+    elif savings > heap[0][0]:
+        heapq.heapreplace(heap, (savings, -order, rec))
+
+@instrumented('calculator.generate_summary_report')
+def generate_summary_report(all_recommendations, top_k=5, group_by=None, keep_all=True):
+    """Generate summary of all recommendations
+
+    Accepts any iterable and makes one streaming pass: totals are summed
+    and the top_k recommendations by annual savings kept in a bounded heap,
+    so ranking costs O(n log k). Ties keep input order, exactly like
+    sorted(..., reverse=True)[:top_k]. With group_by (a key such as
+    'category', or a function of a recommendation) per-group totals and
+    top lists are added under 'groups'; recommendations without the key
+    fall under None. keep_all=False drops 'all_recommendations', so memory
+    stays O(k) for large portfolios.
+    """
+    kept = [] if keep_all else None
+    total_current_cost = 0
+    total_monthly_savings = 0
+    top = []
+    groups = {}
+    group_of = group_by if callable(group_by) or group_by is None else (lambda r: r.get(group_by))
+    for order, rec in enumerate(all_recommendations):
+        if rec.__class__ is Recommendation:
+            # Slot reads; a Python-level get() per key would cost more than the dicts it replaced
+            current_cost, monthly_savings, annual_savings = rec.current_cost, rec.monthly_savings, rec.annual_savings
+        else:
+            get = rec.get
+            current_cost = get('current_cost', 0)
+            monthly_savings = get('monthly_savings', 0)
+            annual_savings = get('annual_savings', 0)
+        total_current_cost += current_cost
+        total_monthly_savings += monthly_savings
+        if top_k > 0 and (len(top) < top_k or annual_savings > top[0][0]):
+            _offer(top, top_k, annual_savings, order, rec)
+        if group_of is not None:
+            key = group_of(rec)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {'cost': 0, 'savings': 0, 'count': 0, 'top': []}
+            group['cost'] += current_cost
+            group['savings'] += monthly_savings
+            group['count'] += 1
+            if top_k > 0:
+                _offer(group['top'], top_k, annual_savings, order, rec)
+        if kept is not None:
+            kept.append(rec)
+
+    summary = _summary(total_current_cost, total_monthly_savings, top)
+    if group_of is not None:
+        summary['groups'] = {
+            key: {'recommendations': group['count'], **_summary(group['cost'], group['savings'], group['top'])}
+            for key, group in groups.items()
         }
-    
-    total_current_cost = sum(r.get('current_cost', 0) for r in all_recommendations)
-    total_monthly_savings = sum(r.get('monthly_savings', 0) for r in all_recommendations)
-    
+    if kept is not None:
+        summary['all_recommendations'] = kept
+    return summary
+
+def _summary(total_current_cost, total_monthly_savings, top):
     return {
         'total_monthly_cost': total_current_cost,
         'total_annual_cost': total_current_cost * 12,
         'total_monthly_savings': total_monthly_savings,
         'total_annual_savings': total_monthly_savings * 12,
         'savings_percentage': (total_monthly_savings / total_current_cost * 100) if total_current_cost > 0 else 0,
-        'top_recommendations': sorted(all_recommendations, key=lambda x: x.get('annual_savings', 0), reverse=True)[:5],
-        'all_recommendations': all_recommendations
-    }
\ No newline at end of file
+        'top_recommendations': [rec for _savings, _order, rec in sorted(top, reverse=True)],
+    }
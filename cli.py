@@ -0,0 +1,252 @@
+# cli.py
+"""Command-line entry point for the calculator analyses
+
+    python -m cli cost --provider openai --model gpt-4o --calls 100000 --input-tokens 500 --output-tokens 200
+    python -m cli analyze workloads.csv --dev-tools seats.json --format json
+    python -m cli logs usage.jsonl --by provider,model --workers 4 --format csv
+    python -m cli seats activity.csv --idle-days 30
+    python -m cli pricing-export pricing.json
+    python -m cli pricing-import sheets/ --pricing-file pricing.json --effective-date 2025-11-01
+
+Heavy modules are imported only by the commands that need them, so a cold
+`cost` or `analyze` stays well under 100 ms. --timings reports import and
+run time on stderr.
+"""
+import argparse
+import importlib
+import sys
+import time
+
+_STARTED = time.perf_counter()
+_import_seconds = 0.0
+
+def _lazy(module):
+    """Import a module on first use, accounting the time to the import budget"""
+    global _import_seconds
+    started = time.perf_counter()
+    loaded = importlib.import_module(module)
+    _import_seconds += time.perf_counter() - started
+    return loaded
+
+def _read_rows(path):
+    """Rows from a JSON list/object or a CSV file, with numeric strings converted"""
+    if path.lower().endswith('.csv'):
+        import csv
+        with open(path, newline='', encoding='utf-8') as handle:
+            return [{k.strip(): _number(v) for k, v in row.items()} for row in csv.DictReader(handle)]
+    import json
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+def _number(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return value
+
+def cmd_cost(args):
+    calculator = _lazy('calculator')
+    cost = calculator.calculate_api_cost(args.provider, args.model, args.calls, args.input_tokens, args.output_tokens)
+    return {'provider': args.provider, 'model': args.model, 'monthly_cost': cost, 'annual_cost': cost * 12}, None
+
+def cmd_analyze(args):
+    calculator = _lazy('calculator')
+    spec = _read_rows(args.spec)
+    if isinstance(spec, dict):
+        workloads, dev_tools = spec.get('workloads', []), spec.get('dev_tools', {})
+    else:
+        workloads, dev_tools = spec, {}
+    if args.dev_tools:
+        dev_tools = _read_rows(args.dev_tools)
+    all_recommendations = []
+    for workload in workloads:
+        if workload.get('monthly_calls', 0) > 0:
+            all_recommendations.extend(calculator.optimize_api_usage(
+                workload['provider'], workload['model'], workload['monthly_calls'],
+                workload.get('avg_input_tokens', 0), workload.get('avg_output_tokens', 0),
+                workload.get('use_case'),
+            ))
+    all_recommendations.extend(calculator.analyze_dev_tools(dev_tools))
+    summary = calculator.generate_summary_report(all_recommendations)
+    return summary, summary['all_recommendations']
+
+def cmd_logs(args):
+    usage_logs = _lazy('usage_logs')
+    if args.workers and args.workers > 1:
+        aggregate = usage_logs.ingest_log_parallel(args.log, args.workers, args.log_format)
+    else:
+        aggregate = usage_logs.ingest_log(args.log, args.log_format)
+    if args.recommend:
+        summary = usage_logs.analyze_usage(aggregate)
+        return summary, summary['all_recommendations']
+    if args.invoice:
+        rows = aggregate.invoice()
+        rows.sort(key=lambda row: -1 if row['cost_cents'] is None else row['cost_cents'], reverse=True)
+        total = sum(row['cost_cents'] or 0 for row in rows)
+        return {'records': aggregate.records, 'parse_errors': aggregate.parse_errors, 'total_cents': total,
+                'lines': rows}, rows
+    dimensions = [d.strip() for d in args.by.split(',') if d.strip()]
+    rows = []
+    for key, totals in aggregate.spend_by(*dimensions).items():
+        key = key if isinstance(key, tuple) else (key,)
+        rows.append({**dict(zip(dimensions, key)), **totals})
+    rows.sort(key=lambda row: row['cost'], reverse=True)
+    return {'records': aggregate.records, 'parse_errors': aggregate.parse_errors, 'spend': rows}, rows
+
+def cmd_seats(args):
+    seat_optimizer = _lazy('seat_optimizer')
+    calculator = _lazy('calculator')
+    result = seat_optimizer.optimize_seats(seat_optimizer.read_activity(args.activity), args.as_of, args.idle_days,
+                                           args.light_usage_days)
+    summary = calculator.generate_summary_report(result['recommendations'])
+    summary.update(seats=result['seats'], skipped=result['skipped'], as_of=result['as_of'])
+    return summary, summary['all_recommendations']
+
+def cmd_pricing_export(args):
+    pricing_store = _lazy('pricing_store')
+    entry = pricing_store.module_pricing_entry(args.effective_date)
+    versions = [entry]
+    if args.append:
+        versions = [v for v in pricing_store.read_pricing_file(args.path) if v['version'] != entry['version']] + versions
+    pricing_store.write_pricing_file(args.path, versions)
+    return {'path': args.path, 'versions': [v['version'] for v in versions]}, None
+
+def cmd_pricing_import(args):
+    price_importer = _lazy('price_importer')
+    result = price_importer.import_price_sheets(
+        args.sheets, args.pricing_file, args.version, args.effective_date, args.workers, args.remove_missing,
+        args.dry_run)
+    failed = [f"{sheet['path']}: {sheet['error']}" for sheet in result['sheets'] if sheet['error']]
+    for line in failed:
+        print(f'warning: {line}', file=sys.stderr)
+    counts = {}
+    for change in result['changes']:
+        counts[change['change']] = counts.get(change['change'], 0) + 1
+    summary = {'version': result['version'], 'written': result['written'], 'sheets': len(result['sheets']),
+               'cached': sum(sheet['cached'] for sheet in result['sheets']), 'failed': len(failed), **counts}
+    if args.format == 'json':
+        return dict(summary, changes=result['changes'], sheets=result['sheets']), None
+    return summary, result['changes'] or None
+
+def _format_rows(rows, fmt):
+    columns = []
+    for row in rows:
+        columns.extend(c for c in row if c not in columns)
+    if fmt == 'csv':
+        import csv
+        import io
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+        return buffer.getvalue().rstrip('\n')
+
+    def cell(value):
+        if isinstance(value, float):
+            return f'{value:,.2f}'
+        return str(value).replace('\n', ' | ') if value is not None else ''
+
+    table = [[cell(row.get(c)) for c in columns] for row in rows]
+    widths = [max([len(c)] + [len(r[i]) for r in table]) for i, c in enumerate(columns)]
+    lines = ['  '.join(c.ljust(w) for c, w in zip(columns, widths)),
+             '  '.join('-' * w for w in widths)]
+    lines.extend('  '.join(v.ljust(w) for v, w in zip(r, widths)) for r in table)
+    return '\n'.join(lines)
+
+def _json_default(value):
+    # Workload and Recommendation records are read-only mappings
+    from collections.abc import Mapping
+    return dict(value) if isinstance(value, Mapping) else str(value)
+
+def render(result, rows, fmt):
+    """Render a command result as json, csv or table"""
+    if fmt == 'json':
+        import json
+        return json.dumps(result, indent=2, default=_json_default)
+    if rows is None:
+        rows = [result]
+    return _format_rows(rows, fmt)
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--format', choices=['json', 'csv', 'table'], default='table')
+    common.add_argument('--timings', action='store_true', help='report import and run timings on stderr')
+    parser = argparse.ArgumentParser(prog='python -m cli', description='AI cost optimization calculator')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    cost = commands.add_parser('cost', parents=[common], help='monthly cost of one workload')
+    cost.add_argument('--provider', required=True)
+    cost.add_argument('--model', required=True)
+    cost.add_argument('--calls', type=float, required=True)
+    cost.add_argument('--input-tokens', type=float, required=True)
+    cost.add_argument('--output-tokens', type=float, required=True)
+    cost.set_defaults(handler=cmd_cost)
+
+    analyze = commands.add_parser('analyze', parents=[common], help='recommendations for a JSON/CSV workload spec')
+    analyze.add_argument('spec', help='list of workloads (JSON/CSV) or {"workloads": [...], "dev_tools": {...}}')
+    analyze.add_argument('--dev-tools', help='JSON seat map {tool: {"total_seats", "active_seats"}}')
+    analyze.set_defaults(handler=cmd_analyze)
+
+    logs = commands.add_parser('logs', parents=[common], help='price a JSONL/CSV usage log')
+    logs.add_argument('log')
+    logs.add_argument('--log-format', choices=['jsonl', 'csv'])
+    logs.add_argument('--by', default='provider,model', help='comma-separated: provider, model, day, use_case')
+    logs.add_argument('--workers', type=int, default=1)
+    logs.add_argument('--recommend', action='store_true', help='run optimize_api_usage on the logged workloads')
+    logs.add_argument('--invoice', action='store_true', help='exact per-model costs, rounded to the cent')
+    logs.set_defaults(handler=cmd_logs)
+
+    seats = commands.add_parser('seats', parents=[common], help='idle, duplicate and over-tiered seats from an activity export')
+    seats.add_argument('activity', help='CSV/JSONL with user, tool, tier, last_active, active_days')
+    seats.add_argument('--as-of', help='review date (default: latest activity in the export)')
+    seats.add_argument('--idle-days', type=int, default=30)
+    seats.add_argument('--light-usage-days', type=int, default=4)
+    seats.set_defaults(handler=cmd_seats)
+
+    export = commands.add_parser('pricing-export', parents=[common], help='write pricing_data tables to a versioned pricing file')
+    export.add_argument('path')
+    export.add_argument('--effective-date', default='0001-01-01')
+    export.add_argument('--append', action='store_true', help='keep the versions already in the file')
+    export.set_defaults(handler=cmd_pricing_export)
+
+    importer = commands.add_parser('pricing-import', parents=[common],
+                                   help='import provider price sheets (HTML/CSV/JSON) as a new pricing version')
+    importer.add_argument('sheets', nargs='+', help='sheet files or directories, named <provider>[-...].<ext>')
+    importer.add_argument('--pricing-file', default='pricing.json')
+    importer.add_argument('--version', help='version name (default: effective date plus a hash of the prices)')
+    importer.add_argument('--effective-date', help='default: today')
+    importer.add_argument('--workers', type=int, help='parser processes (default: one per CPU)')
+    importer.add_argument('--remove-missing', action='store_true',
+                          help="remove models missing from their provider's sheets when most of its models matched")
+    importer.add_argument('--dry-run', action='store_true', help='report changes without writing the pricing file')
+    importer.set_defaults(handler=cmd_pricing_import)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    started = time.perf_counter()
+    try:
+        result, rows = args.handler(args)
+    except KeyError as exc:
+        print(f'error: unknown or missing key {exc}', file=sys.stderr)
+        return 1
+    except (OSError, ValueError) as exc:
+        print(f'error: {exc}', file=sys.stderr)
+        return 1
+    try:
+        print(render(result, rows, args.format))
+    except BrokenPipeError:
+        # Output piped into e.g. head; stop quietly
+        sys.stdout = None
+        return 0
+    if args.timings:
+        run_seconds = time.perf_counter() - started - _import_seconds
+        print(f'timings: import {_import_seconds * 1000:.1f} ms, run {run_seconds * 1000:.1f} ms, '
+              f'total since cli import {(time.perf_counter() - _STARTED) * 1000:.1f} ms', file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
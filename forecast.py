@@ -0,0 +1,77 @@
+# forecast.py
+"""Monte Carlo forecast of API spend under growth, token-mix and price uncertainty
+
+Every scenario draws its own growth rate, token-mix drift and price
+trend; monthly noise is layered on top. Costs for all configurations,
+scenarios and months are computed in one broadcast array expression.
+"""
+import numpy as np
+
+DEFAULT_ASSUMPTIONS = {
+    'monthly_growth_mean': 0.03,    # mean month-over-month call growth
+    'monthly_growth_sd': 0.02,      # spread of the growth rate across scenarios
+    'monthly_volume_noise': 0.05,   # month-to-month volume noise (log sd)
+    'token_drift_sd': 0.10,         # per-scenario shift in average tokens (log sd)
+    'monthly_token_noise': 0.03,    # month-to-month token noise (log sd)
+    'annual_price_change_mean': -0.15,
+    'annual_price_change_sd': 0.10,
+}
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+def model_config(tables, provider, model, multiplier=1.0):
+    """Forecast configuration for a catalog model; multiplier scales its cost (e.g. 0.7 for 30% savings)"""
+    pricing = tables['api_pricing'][provider][model]
+    return {'input_price': pricing['input'], 'output_price': pricing['output'], 'multiplier': multiplier}
+
+def simulate_cost_paths(monthly_calls, avg_input_tokens, avg_output_tokens, configs, months=12, scenarios=5000,
+                        seed=0, assumptions=None):
+    """Monthly cost paths, shape (configs, scenarios, months), for a dict or list of configurations"""
+    a = {**DEFAULT_ASSUMPTIONS, **(assumptions or {})}
+    rng = np.random.default_rng(seed)
+    configs = list(configs.values()) if isinstance(configs, dict) else list(configs)
+    shape = (scenarios, months)
+
+    growth = rng.normal(a['monthly_growth_mean'], a['monthly_growth_sd'], (scenarios, 1))
+    log_volume = np.cumsum(np.log1p(growth) + rng.normal(0, a['monthly_volume_noise'], shape), axis=1)
+    calls = monthly_calls * np.exp(log_volume - log_volume[:, :1])
+
+    drift = rng.normal(0, a['token_drift_sd'], (scenarios, 2, 1))
+    token_noise = rng.normal(0, a['monthly_token_noise'], (scenarios, 2, months))
+    tokens = np.exp(drift + token_noise) * np.array([avg_input_tokens, avg_output_tokens], dtype=np.float64)[:, None]
+
+    annual_change = rng.normal(a['annual_price_change_mean'], a['annual_price_change_sd'], (scenarios, 1))
+    price_factor = np.clip(1 + annual_change, 0.05, None) ** (np.arange(months) / 12)
+
+    prices = np.array([[c['input_price'], c['output_price']] for c in configs], dtype=np.float64)
+    multipliers = np.array([c.get('multiplier', 1.0) for c in configs], dtype=np.float64)
+    # (C, 1, 1) x (S, M) x [(S, M) . (C, 2)] -> (C, S, M)
+    per_call = np.einsum('skm,ck->csm', tokens, prices) / 1_000_000
+    return multipliers[:, None, None] * calls[None] * price_factor[None] * per_call
+
+def percentile_bands(paths, percentiles=DEFAULT_PERCENTILES):
+    """Per-month and full-horizon percentiles of (scenarios, months) cost paths"""
+    monthly = np.percentile(paths, percentiles, axis=0)
+    totals = np.percentile(paths.sum(axis=1), percentiles)
+    return {
+        'monthly': {f'p{p}': monthly[i].tolist() for i, p in enumerate(percentiles)},
+        'total': {f'p{p}': float(totals[i]) for i, p in enumerate(percentiles)},
+        'mean_total': float(paths.sum(axis=1).mean()),
+    }
+
+def forecast_spend(monthly_calls, avg_input_tokens, avg_output_tokens, configs, months=12, scenarios=5000, seed=0,
+                   assumptions=None, percentiles=DEFAULT_PERCENTILES):
+    """Percentile bands of monthly and total spend per configuration
+
+    configs maps a name (e.g. 'current', 'recommended') to a config from
+    model_config(). Paired scenarios are shared across configurations, so
+    'savings' bands compare like with like.
+    """
+    names = list(configs)
+    paths = simulate_cost_paths(monthly_calls, avg_input_tokens, avg_output_tokens, configs, months, scenarios,
+                                seed, assumptions)
+    result = {'months': list(range(1, months + 1)), 'scenarios': scenarios, 'seed': seed}
+    for i, name in enumerate(names):
+        result[name] = percentile_bands(paths[i], percentiles)
+    if len(names) >= 2:
+        result['savings'] = percentile_bands(paths[0] - paths[1], percentiles)
+    return result
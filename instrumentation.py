@@ -0,0 +1,172 @@
+# instrumentation.py
+"""Opt-in timers, counters and a sampling profiler
+
+Instrumentation is off unless AI_COST_INSTRUMENT=1 is set (or enable() is
+called) before the instrumented modules are imported. When it is off,
+@instrumented returns the function itself and timer() returns a shared
+no-op context, so disabled hot paths pay nothing per call.
+
+    AI_COST_INSTRUMENT=1 streamlit run app.py
+    AI_COST_INSTRUMENT=1 python -m pricing_service     # GET /metrics
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+_enabled = os.environ.get('AI_COST_INSTRUMENT', '').lower() in ('1', 'true', 'yes')
+_lock = threading.Lock()
+_timings = {}   # name -> [count, total seconds, max seconds]
+_counters = Counter()
+_NOOP = nullcontext()
+
+def enable():
+    """Turn instrumentation on; affects functions decorated from now on and all timers"""
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def enabled():
+    return _enabled
+
+def reset():
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+
+def record(name, seconds):
+    """Add one timed call to a timer"""
+    with _lock:
+        stats = _timings.get(name)
+        if stats is None:
+            _timings[name] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            if seconds > stats[2]:
+                stats[2] = seconds
+
+def count(name, n=1):
+    """Increment a counter; a no-op while disabled"""
+    if _enabled:
+        with _lock:
+            _counters[name] += n
+
+class _Timer:
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.started)
+        return False
+
+def timer(name):
+    """Context manager timing a block, e.g. chart rendering"""
+    return _Timer(name) if _enabled else _NOOP
+
+def instrumented(name):
+    """Decorator timing every call of a function, applied only when instrumentation is enabled"""
+    def decorate(fn):
+        if not _enabled:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+def snapshot():
+    """Current timers and counters as a JSON-serialisable dict"""
+    with _lock:
+        return {
+            'timers': {
+                name: {'count': n, 'total_seconds': total, 'mean_seconds': total / n, 'max_seconds': peak}
+                for name, (n, total, peak) in sorted(_timings.items())
+            },
+            'counters': dict(sorted(_counters.items())),
+        }
+
+def to_json(indent=None):
+    return json.dumps(snapshot(), indent=indent)
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def to_prometheus(prefix='ai_cost'):
+    """Timers and counters in the Prometheus text exposition format"""
+    data = snapshot()
+    lines = [
+        f'# HELP {prefix}_call_seconds Time spent in instrumented calls and blocks',
+        f'# TYPE {prefix}_call_seconds summary',
+    ]
+    for name, stats in data['timers'].items():
+        lines.append(f'{prefix}_call_seconds_sum{{name="{_label(name)}"}} {stats["total_seconds"]:.9f}')
+        lines.append(f'{prefix}_call_seconds_count{{name="{_label(name)}"}} {stats["count"]}')
+    lines += [f'# HELP {prefix}_call_seconds_max Slowest instrumented call',
+              f'# TYPE {prefix}_call_seconds_max gauge']
+    for name, stats in data['timers'].items():
+        lines.append(f'{prefix}_call_seconds_max{{name="{_label(name)}"}} {stats["max_seconds"]:.9f}')
+    lines += [f'# HELP {prefix}_events_total Instrumented event counters',
+              f'# TYPE {prefix}_events_total counter']
+    for name, value in data['counters'].items():
+        lines.append(f'{prefix}_events_total{{name="{_label(name)}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+def _stack(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+def profile_run(fn, *args, interval=0.001, output=None, **kwargs):
+    """Run fn once under a sampling profiler; returns (result, profile)
+
+    A background thread samples the calling thread's stack every interval
+    seconds. profile holds 'samples', 'interval' and 'stacks', a Counter
+    of collapsed stacks ("outer;inner" -> samples). With output, those are
+    written in the folded format that flamegraph.pl and speedscope read.
+    The sampler needs the GIL, so CPU-bound code is sampled at most every
+    sys.getswitchinterval() seconds.
+    """
+    target = threading.get_ident()
+    stacks = Counter()
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(interval):
+            frame = sys._current_frames().get(target)
+            if frame is not None:
+                stacks[_stack(frame)] += 1
+
+    sampler = threading.Thread(target=sample, name='profile-sampler', daemon=True)
+    sampler.start()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        done.set()
+        sampler.join()
+    profile = {'samples': sum(stacks.values()), 'interval': interval, 'stacks': stacks}
+    if output:
+        with open(output, 'w', encoding='utf-8') as handle:
+            handle.writelines(f'{stack} {n}\n' for stack, n in stacks.most_common())
+    return result, profile
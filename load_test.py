@@ -0,0 +1,103 @@
+# load_test.py
+"""Load test for pricing_service: throughput and latency percentiles
+
+    python load_test.py --url http://127.0.0.1:8080 --endpoint /cost --connections 8 --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from pricing_data import API_PRICING
+
+def sample_payloads(endpoint, n, batch_size, seed=0):
+    """Synthetic request bodies for an endpoint"""
+    rng = random.Random(seed)
+    models = [(provider, model) for provider, models in API_PRICING.items() for model in models]
+
+    def call():
+        provider, model = rng.choice(models)
+        return {'provider': provider, 'model': model,
+                'input_tokens': rng.randint(10, 20_000), 'output_tokens': rng.randint(1, 4_000)}
+
+    bodies = []
+    for _ in range(min(n, 1000)):
+        if endpoint == '/cost/batch':
+            body = {'requests': [call() for _ in range(batch_size)]}
+        elif endpoint == '/recommendations':
+            c = call()
+            body = {'provider': c['provider'], 'model': c['model'], 'monthly_calls': rng.randint(1_000, 10_000_000),
+                    'avg_input_tokens': c['input_tokens'], 'avg_output_tokens': c['output_tokens'],
+                    'use_case': 'customer_support'}
+        else:
+            body = call()
+        bodies.append(json.dumps(body).encode())
+    return bodies
+
+async def _worker(host, port, path, bodies, count, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for k in range(count):
+            body = bodies[k % len(bodies)]
+            request = (f'POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n'
+                       f'Content-Length: {len(body)}\r\n\r\n').encode() + body
+            started = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = 0
+            for line in head.split(b'\r\n'):
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':', 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if not head.startswith(b'HTTP/1.1 200'):
+                errors.append(head.split(b'\r\n', 1)[0].decode())
+    finally:
+        writer.close()
+
+async def run_load_test(url, endpoint='/cost', connections=8, requests=10_000, batch_size=100):
+    """Drive the service with keep-alive connections and summarise the latencies"""
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    bodies = sample_payloads(endpoint, requests, batch_size)
+    latencies, errors = [], []
+    per_connection = [requests // connections + (i < requests % connections) for i in range(connections)]
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _worker(host, port, endpoint, bodies, count, latencies, errors) for count in per_connection if count
+    ))
+    elapsed = time.perf_counter() - started
+    ms = np.array(latencies) * 1000
+    return {
+        'endpoint': endpoint,
+        'connections': connections,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': elapsed,
+        'requests_per_sec': len(latencies) / elapsed if elapsed else 0,
+        'latency_ms': {
+            'p50': float(np.percentile(ms, 50)),
+            'p90': float(np.percentile(ms, 90)),
+            'p99': float(np.percentile(ms, 99)),
+            'p999': float(np.percentile(ms, 99.9)),
+            'max': float(ms.max()),
+        } if len(ms) else {},
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the pricing service')
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--endpoint', default='/cost', choices=['/cost', '/cost/batch', '/recommendations'])
+    parser.add_argument('--connections', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=10_000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args(argv)
+    report = asyncio.run(run_load_test(args.url, args.endpoint, args.connections, args.requests, args.batch_size))
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
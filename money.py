@@ -0,0 +1,77 @@
+# money.py
+"""Exact money arithmetic in integer nano-cents
+
+Catalog prices are dollars per million tokens with up to five decimal
+places (e.g. 1.3125), which is a whole number of nano-cents per token:
+
+    $1 per million tokens = 1e-6 $/token = 1e-4 cents/token = 100_000 nano-cents/token
+
+so token totals times integer prices give exact integer costs. Totals are
+rounded to whole cents once, at the end, like an invoice line.
+"""
+from decimal import Decimal, ROUND_HALF_EVEN, ROUND_HALF_UP
+
+NANOCENTS_PER_CENT = 10 ** 9
+NANOCENTS_PER_TOKEN_PER_DOLLAR_PER_MILLION = 10 ** 5
+_INT64_MAX = 2 ** 63 - 1
+
+def price_to_nanocents(price_per_million):
+    """Integer nano-cents per token for a $/M price; raises ValueError if it isn't representable"""
+    # str() gives the shortest repr, so 1.3125 converts as written, not as its binary float
+    value = Decimal(str(price_per_million)) * NANOCENTS_PER_TOKEN_PER_DOLLAR_PER_MILLION
+    if value != value.to_integral_value():
+        raise ValueError(f'Price {price_per_million} $/M is finer than one nano-cent per token')
+    return int(value)
+
+def build_exact_prices(api_pricing):
+    """Integer (2, n_models) nano-cent price matrix in price_matrix order"""
+    # numpy is imported lazily so the scalar helpers stay cheap to import
+    import numpy as np
+    model_keys = [(provider, model) for provider, models in api_pricing.items() for model in models]
+    prices = np.array(
+        [[price_to_nanocents(api_pricing[p][m]['input']) for p, m in model_keys],
+         [price_to_nanocents(api_pricing[p][m]['output']) for p, m in model_keys]],
+        dtype=np.int64,
+    ).reshape(2, len(model_keys))
+    return {
+        'model_keys': model_keys,
+        'index': {key: i for i, key in enumerate(model_keys)},
+        'prices': np.ascontiguousarray(prices),
+    }
+
+def token_count(calls, avg_tokens):
+    """Whole tokens billed for calls at an average token count, rounded half-even"""
+    return int((Decimal(str(calls)) * Decimal(str(avg_tokens))).to_integral_value(ROUND_HALF_EVEN))
+
+def to_cents(nanocents, rounding=ROUND_HALF_UP):
+    """Round integer nano-cents (a Python int or an integer array) to whole cents"""
+    if hasattr(nanocents, 'dtype'):
+        if rounding != ROUND_HALF_UP:
+            raise ValueError('Arrays round half-up only')
+        # Halves round toward +inf, which matches ROUND_HALF_UP for non-negative costs
+        return (nanocents + NANOCENTS_PER_CENT // 2) // NANOCENTS_PER_CENT
+    return int((Decimal(int(nanocents)) / NANOCENTS_PER_CENT).to_integral_value(rounding))
+
+def cents_to_dollars(cents):
+    """Whole cents as an exact Decimal dollar amount"""
+    return (Decimal(int(cents)) / 100).quantize(Decimal('0.01'))
+
+def token_costs(input_tokens, output_tokens, input_prices, output_prices):
+    """Exact nano-cent costs of integer token totals, broadcast against integer prices
+
+    Runs in int64 when the largest product provably fits and falls back to
+    Python ints (object arrays) otherwise, so results are never wrapped.
+    """
+    import numpy as np
+    input_tokens = np.asarray(input_tokens)
+    output_tokens = np.asarray(output_tokens)
+    if input_tokens.dtype.kind not in 'iu' or output_tokens.dtype.kind not in 'iu':
+        raise TypeError('Exact costs need integer token totals')
+    bound = 0
+    for tokens, prices in ((input_tokens, input_prices), (output_tokens, output_prices)):
+        if tokens.size and np.size(prices):
+            bound += int(np.abs(tokens).max()) * int(np.abs(prices).max())
+    if bound <= _INT64_MAX:
+        return input_tokens.astype(np.int64) * input_prices + output_tokens.astype(np.int64) * output_prices
+    return (input_tokens.astype(object) * np.asarray(input_prices).astype(object)
+            + output_tokens.astype(object) * np.asarray(output_prices).astype(object))
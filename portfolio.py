@@ -0,0 +1,125 @@
+# portfolio.py
+"""Portfolio analysis: price and optimise many workloads together
+
+A portfolio is a list of workloads, one per service, each shaped like
+optimize_api_usage's arguments plus a service name:
+
+    service, provider, model, monthly_calls, avg_input_tokens, avg_output_tokens, use_case
+
+Workloads with the same shape (everything but the service) share one
+optimize_api_usage run, and current costs for all unique shapes come from
+a single vectorised pricing pass.
+"""
+import csv
+import io
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from calculator import active_pricing, calculate_api_cost_batch, generate_summary_report, optimize_api_usage
+from records import Workload
+
+PORTFOLIO_FIELDS = ('service', 'provider', 'model', 'monthly_calls', 'avg_input_tokens', 'avg_output_tokens',
+                    'use_case')
+_NUMERIC_FIELDS = ('monthly_calls', 'avg_input_tokens', 'avg_output_tokens')
+
+# Portfolio runs are CPU-bound; one background worker keeps the Streamlit
+# script thread free without running several analyses against each other
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='portfolio')
+
+def read_portfolio_csv(source):
+    """(rows, errors) from a CSV path, text or binary file object with PORTFOLIO_FIELDS columns"""
+    if isinstance(source, str):
+        with open(source, newline='', encoding='utf-8') as handle:
+            return read_portfolio_csv(handle)
+    if isinstance(source, (bytes, bytearray)) or hasattr(source, 'getvalue') and isinstance(source.getvalue(), bytes):
+        data = source if isinstance(source, (bytes, bytearray)) else source.getvalue()
+        source = io.StringIO(data.decode('utf-8-sig'))
+    rows, errors = [], []
+    for line, row in enumerate(csv.DictReader(source), start=2):
+        # DictReader files cells past the header under None as a list
+        extra = row.pop(None, None)
+        if extra:
+            errors.append({'line': line, 'error': f'{len(extra)} more cell(s) than the header'})
+            continue
+        row ={(k or '').strip(): (v or '').strip() for k, v in row.items()}
+        try:
+            for field in _NUMERIC_FIELDS:
+                value = float(row.get(field) or 0)
+                # float() accepts nan and inf, which would poison every portfolio total
+                if not math.isfinite(value) or value < 0:
+                    raise ValueError(f'{field} must be a finite, non-negative number, got {row[field]!r}')
+                row[field] = value
+            if not row.get('provider') or not row.get('model'):
+                raise ValueError('provider and model are required')
+        except ValueError as exc:
+            errors.append({'line': line, 'error': str(exc)})
+            continue
+        row['service'] = row.get('service') or f'line {line}'
+        row['use_case'] = row.get('use_case') or None
+        rows.append(row)
+    return rows, errors
+
+def _shape(row):
+    return (row['provider'], row['model'], row.get('monthly_calls', 0), row.get('avg_input_tokens', 0),
+            row.get('avg_output_tokens', 0), row.get('use_case'))
+
+def analyze_portfolio(workloads, top_k=5, progress=None):
+    """Price and optimise every workload; returns per-service rows, a portfolio summary and errors
+
+    progress, if given, is called as progress(done, total) over the unique
+    workload shapes.
+    """
+    import numpy as np
+    price_matrix = active_pricing()['price_matrix']
+    index = price_matrix['index']
+
+    services, errors, shapes = [], [], {}
+    for n, row in enumerate(workloads):
+        if (row['provider'], row['model']) not in index:
+            errors.append({'service': row.get('service', n), 'error': f'Unknown model {row["provider"]}/{row["model"]}'})
+            continue
+        services.append((row.get('service', n), shapes.setdefault(_shape(row), len(shapes))))
+
+    unique = list(shapes)
+    # One (shapes x models) pricing pass; each shape's current cost is its own model's column
+    costs = calculate_api_cost_batch([s[2] for s in unique], [s[3] for s in unique], [s[4] for s in unique],
+                                     price_matrix)
+    costs = costs[np.arange(len(unique)), [index[s[:2]] for s in unique]] if unique else costs[:, 0]
+
+    recommendations = []
+    for n, (provider, model, monthly_calls, avg_input_tokens, avg_output_tokens, use_case) in enumerate(unique):
+        recommendations.append(optimize_api_usage(provider, model, monthly_calls, avg_input_tokens,
+                                                  avg_output_tokens, use_case) if monthly_calls > 0 else [])
+        if progress is not None:
+            progress(n + 1, len(unique))
+
+    rows = []
+    for service, k in services:
+        provider, model, monthly_calls, avg_input_tokens, avg_output_tokens, use_case = unique[k]
+        best = max(recommendations[k], key=lambda r: r.monthly_savings, default=None)
+        rows.append({
+            'service': service,
+            'workload': Workload(provider, model, monthly_calls, avg_input_tokens, avg_output_tokens, use_case),
+            'monthly_cost': float(costs[k]),
+            'best_recommendation': best.title if best else None,
+            'best_monthly_savings': best.monthly_savings if best else 0.0,
+            'recommendations': recommendations[k],
+        })
+
+    summary = generate_summary_report(
+        (rec for service, k in services for rec in recommendations[k]), top_k=top_k, keep_all=False)
+    total_cost = sum(row['monthly_cost'] for row in rows)
+    best_savings = sum(row['best_monthly_savings'] for row in rows)
+    summary.update({
+        'services': len(rows),
+        'unique_workloads': len(unique),
+        'portfolio_monthly_cost': total_cost,
+        # The best recommendation per service; recommendations within a service overlap
+        'portfolio_monthly_savings': best_savings,
+        'portfolio_savings_percentage': best_savings / total_cost * 100 if total_cost > 0 else 0,
+    })
+    return {'rows': rows, 'summary': summary, 'errors': errors}
+
+def submit_portfolio(workloads, top_k=5, progress=None):
+    """Run analyze_portfolio on the background worker; returns a Future"""
+    return _EXECUTOR.submit(analyze_portfolio, list(workloads), top_k, progress)
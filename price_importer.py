@@ -0,0 +1,438 @@
+# price_importer.py
+"""Import provider price sheets into a new pricing file version
+
+Sheets are local HTML, CSV or JSON snapshots of provider pricing pages,
+named after their provider: openai.html, anthropic-2025-11.json,
+google_vertex.csv. Each (provider, format) has a parser in PARSERS that
+returns {model: {'input', 'output'[, 'context', 'tier']}} in $ per 1M tokens.
+Every provider in pricing_data has parsers for all three formats with its
+own column names and model-name normalisation (normalise_model), so
+'Claude Opus 4.1' and 'claude-opus-4-1-20250805' both import as
+claude-opus-4.1. Other providers or layouts can be added with
+register_parser.
+
+Parsers run in a process pool and their results are cached by content
+hash, so re-importing unchanged sheets costs one read and one hash each.
+The import is diffed against the latest version in the pricing file and
+written as a new version with write_pricing_file. Nothing here touches the
+network; calculations only ever read the pricing file.
+
+    python -m cli pricing-import sheets/ --pricing-file pricing.json --effective-date 2025-11-01
+"""
+import csv
+import hashlib
+import io
+import json
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, InvalidOperation
+from functools import partial
+from html.parser import HTMLParser
+
+import pricing_data
+from pricing_store import (DEFAULT_PRICING_FILE, _atomic_write, _day, module_pricing_entry, read_pricing_file,
+                           write_pricing_file)
+
+# Bump when parser output changes so cached parses are discarded
+PARSER_VERSION = 3
+SHEET_FORMATS = {'.csv': 'csv', '.json': 'json', '.html': 'html', '.htm': 'html'}
+CACHE_SUFFIX = '.import-cache.json'
+PRICE_FIELDS = ('input', 'output', 'context', 'tier')
+# With remove_missing, a provider's unlisted models are only removed when
+# its sheets name at least this share of the current models
+MIN_MATCHED_SHARE = 0.5
+
+# Column names each field is read from, matched case-insensitively after
+# dropping everything but letters and digits
+DEFAULT_COLUMNS = {
+    'model': ('model', 'modelname', 'name', 'modelid', 'id', 'sku'),
+    'input': ('input', 'inputprice', 'input1mtokens', 'input1ktokens', 'inputper1m', 'inputper1k', 'prompt',
+              'promptprice', 'inputtokens'),
+    'output': ('output', 'outputprice', 'output1mtokens', 'output1ktokens', 'outputper1m', 'outputper1k',
+               'completion', 'completionprice', 'outputtokens'),
+    'context': ('context', 'contextwindow', 'contextlength', 'maxcontext', 'maxinputtokens'),
+    'tier': ('tier',),
+}
+# Extra column names used on individual providers' pages
+PROVIDER_COLUMNS = {
+    'anthropic': {'input': ('baseinputtokens', 'inputmtok'), 'output': ('outputmtok',)},
+    'google': {'input': ('inputpricepaid', 'inputprice1m'), 'output': ('outputpricepaid', 'outputprice1m')},
+    'cohere': {'input': ('inputcost',), 'output': ('outputcost',)},
+}
+
+# Per-provider rewrites of slugged sheet names (API ids, marketing names) to catalog keys,
+# applied in order after dated and -latest suffixes are dropped
+MODEL_PATTERNS = {
+    # claude-3-5-haiku -> claude-haiku-3.5, claude-opus-4-1 -> claude-opus-4.1
+    'anthropic': ((r'^claude-(\d)-(\d)-([a-z]+)$', r'claude-\3-\1.\2'),
+                  (r'^claude-(\d)-([a-z]+)$', r'claude-\2-\1'),
+                  (r'^claude-([a-z]+)-(\d)-(\d)$', r'claude-\1-\2.\3')),
+    # gemini-2.0-flash-001 -> gemini-2.0-flash
+    'google': ((r'^(gemini-.+)-\d{3}$', r'\1'),),
+    # mistral-large-2411 -> mistral-large (a YYMM release suffix)
+    'mistral': ((r'-\d{2}(0[1-9]|1[0-2])$', ''),),
+    # command-a-03-2025 -> command-a
+    'cohere': ((r'-(0[1-9]|1[0-2])-20\d{2}$', ''),),
+}
+MODEL_ALIASES = {
+    'openai': {'chatgpt-4o': 'gpt-4o', 'gpt-3.5-turbo-0125': 'gpt-3.5-turbo'},
+    'xai': {'grok-3': 'grok-3-beta', 'grok-3-mini-beta': 'grok-3-mini'},
+}
+
+_NUMBER = re.compile(r'[-+]?\d[\d,]*(?:\.\d+)?|[-+]?\.\d+')
+_SIZE_SUFFIX = {'k': 1000, 'm': 1_000_000}
+
+def _key(text):
+    return re.sub(r'[^a-z0-9]', '', str(text).lower())
+
+def _decimal(value):
+    """First number in a cell ('$2.50 / 1M tokens' -> 2.50), or None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    match = _NUMBER.search(str(value or ''))
+    if match is None:
+        return None
+    try:
+        return Decimal(match.group().replace(',', ''))
+    except InvalidOperation:
+        return None
+
+def _context(value):
+    """Context window from '128K', '1M', '1,048,576' or a number"""
+    number = _decimal(value)
+    if number is None or not number.is_finite():
+        return None
+    suffix = re.search(r'\d\s*([kKmM])', str(value))
+    return int(number * _SIZE_SUFFIX[suffix.group(1).lower()]) if suffix else int(number)
+
+def model_slug(name):
+    """Lower-case, hyphenated model name: 'Claude Opus 4.1 (legacy)' -> 'claude-opus-4.1'"""
+    slug = re.sub(r'\(.*?\)', ' ', str(name).lower()).replace('+', ' plus ')
+    slug = re.sub(r'[\s_/:]+', '-', slug.strip())
+    slug = re.sub(r'-+', '-', re.sub(r'[^a-z0-9.-]', '', slug)).strip('-.')
+    # Dated snapshots and rolling aliases price like their base model
+    return re.sub(r'(-\d{8}|-\d{4}-\d{2}-\d{2}|-latest)$', '', slug)
+
+def normalise_model(name, provider=None):
+    """Catalog key for a model name as written on a provider's sheet"""
+    slug = model_slug(name)
+    for pattern, replacement in MODEL_PATTERNS.get(provider, ()):
+        slug = re.sub(pattern, replacement, slug)
+    return MODEL_ALIASES.get(provider, {}).get(slug, slug)
+
+def _columns(provider):
+    columns = {field: list(names) for field, names in DEFAULT_COLUMNS.items()}
+    for field, names in PROVIDER_COLUMNS.get(provider, {}).items():
+        columns[field] = list(names) + columns[field]
+    return columns
+
+def _match_columns(header, columns):
+    """{field: column position} for a header row; None unless model, input and output are found"""
+    keys = [_key(cell) for cell in header]
+    found = {}
+    for field, names in columns.items():
+        for name in names:
+            if name in keys:
+                found[field] = keys.index(name)
+                break
+    if not {'model', 'input', 'output'} <= found.keys():
+        return None
+    return found
+
+def _scale(header_cell):
+    """Multiplier from a header's price unit to $ per 1M tokens"""
+    key = _key(header_cell)
+    return 1000 if '1k' in key or 'perk' in key or 'thousand' in key else 1
+
+def _rows_to_models(header, rows, columns, provider=None):
+    """Models from a header and rows of cells, keyed by normalise_model; rows without both prices are skipped"""
+    found = _match_columns(header, columns)
+    if found is None:
+        return None
+    scales = {field: _scale(header[found[field]]) for field in ('input', 'output')}
+    models = {}
+    for row in rows:
+        if len(row) <= max(found.values()):
+            continue
+        model = normalise_model(row[found['model']], provider)
+        prices = {field: _decimal(row[found[field]]) for field in ('input', 'output')}
+        if not model or None in prices.values():
+            continue
+        # Decimal keeps '0.00015 per 1K' exact before the one conversion to float
+        entry = {field: float(prices[field] * scales[field]) for field in ('input', 'output')}
+        if not all(math.isfinite(price) and price >= 0 for price in entry.values()):
+            raise ValueError(f'{model}: prices must be finite, non-negative numbers, got {prices["input"]} '
+                             f'and {prices["output"]}')
+        if 'context' in found:
+            context = _context(row[found['context']])
+            if context:
+                entry['context'] = context
+        if 'tier' in found and str(row[found['tier']]).strip():
+            entry['tier'] = str(row[found['tier']]).strip().lower()
+        models[model] = entry
+    return models
+
+def parse_csv(data, provider=None):
+    """Models from a CSV sheet with a header row"""
+    rows = list(csv.reader(io.StringIO(data.decode('utf-8-sig'))))
+    models = _rows_to_models(rows[0], rows[1:], _columns(provider), provider) if rows else None
+    if models is None:
+        raise ValueError('No model, input and output price columns in CSV header')
+    return models
+
+def parse_json(data, provider=None):
+    """Models from a JSON list of rows, {"models": [...]} or {model: {fields}}"""
+    document = json.loads(data)
+    if isinstance(document, dict):
+        document = document.get('models', document)
+    if isinstance(document, dict):
+        if not all(isinstance(fields, dict) for fields in document.values()):
+            raise ValueError('JSON sheet models must map to objects of price fields')
+        document = [dict(fields, model=model) for model, fields in document.items()]
+    if not isinstance(document, list) or not all(isinstance(row, dict) for row in document):
+        raise ValueError('JSON sheet must hold a list of model objects')
+    header = []
+    for row in document:
+        header.extend(column for column in row if column not in header)
+    models = _rows_to_models(header, [[row.get(column, '') for column in header] for row in document],
+                             _columns(provider), provider)
+    if models is None:
+        raise ValueError('No model, input and output price fields in JSON sheet')
+    return models
+
+class _TableParser(HTMLParser):
+    """Collects the text of every table cell as tables -> rows -> cells"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables = []
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self.tables.append([])
+        elif tag == 'tr' and self.tables:
+            self._row = []
+            self.tables[-1].append(self._row)
+        elif tag in ('td', 'th') and self._row is not None:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag in ('td', 'th') and self._cell is not None:
+            self._row.append(' '.join(''.join(self._cell).split()))
+            self._cell = None
+        elif tag == 'tr':
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+def parse_html(data, provider=None):
+    """Models from every pricing table on an HTML page; later tables win on duplicate models"""
+    parser = _TableParser()
+    parser.feed(data.decode('utf-8', errors='replace'))
+    columns = _columns(provider)
+    models, found = {}, False
+    for table in parser.tables:
+        for n, row in enumerate(table):
+            if _match_columns(row, columns) is not None:
+                models.update(_rows_to_models(row, table[n + 1:], columns, provider))
+                found = True
+                break
+    if not found:
+        raise ValueError('No pricing table with model, input and output columns in HTML sheet')
+    return models
+
+FORMAT_PARSERS = {'csv': parse_csv, 'json': parse_json, 'html': parse_html}
+PARSERS = {}
+
+def register_parser(provider, fmt, parser):
+    """Use parser(data: bytes) -> {model: entry} for one provider's sheets in one format
+
+    Parsers run in worker processes, so they must be picklable: module-level
+    functions or functools.partial objects over them.
+    """
+    if fmt not in FORMAT_PARSERS:
+        raise ValueError(f'Unknown sheet format {fmt!r}; expected one of {sorted(FORMAT_PARSERS)}')
+    PARSERS[(provider, fmt)] = parser
+
+for _provider in pricing_data.API_PRICING:
+    for _fmt, _parse in FORMAT_PARSERS.items():
+        register_parser(_provider, _fmt, partial(_parse, provider=_provider))
+
+def sheet_provider(path):
+    """Provider named by a sheet file: the file name up to the first '-', '_' or '.'"""
+    return re.split(r'[-_.]', os.path.basename(path), maxsplit=1)[0].lower()
+
+def discover_sheets(paths):
+    """(path, provider, format) for sheet files and sheet files directly inside directories, in path order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+        else:
+            files.append(path)
+    sheets = []
+    for path in files:
+        fmt = SHEET_FORMATS.get(os.path.splitext(path)[1].lower())
+        if fmt is not None and os.path.isfile(path):
+            sheets.append((path, sheet_provider(path), fmt))
+    return sheets
+
+def _parse_sheet(parser, data):
+    """Worker entry point; returns (models, error message)"""
+    try:
+        return parser(data), None
+    except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+        return None, str(exc) or type(exc).__name__
+
+def _load_cache(path):
+    """{'provider:format:sha256': models} from a parse cache written by this PARSER_VERSION"""
+    try:
+        with open(path, encoding='utf-8') as handle:
+            document = json.load(handle)
+        if document.get('parser_version') == PARSER_VERSION:
+            return document['sheets']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    return {}
+
+def parse_sheets(sheets, workers=None, cache_path=None, update_cache=True):
+    """Parse (path, provider, format) sheets; returns ({provider: {model: entry}}, report rows)
+
+    Sheets for the same provider are merged in order, later sheets winning.
+    Unchanged sheets are served from cache_path when given, and the cache is
+    rewritten with this run's parses when update_cache is set.
+    """
+    cache = _load_cache(cache_path) if cache_path else {}
+    jobs, keys, report, results = [], [], [], {}
+    for path, provider, fmt in sheets:
+        with open(path, 'rb') as handle:
+            data = handle.read()
+        key = f'{provider}:{fmt}:{hashlib.sha256(data).hexdigest()}'
+        keys.append(key)
+        report.append({'path': path, 'provider': provider, 'format': fmt, 'cached': key in cache})
+        if key in cache:
+            results[key] = (cache[key], None)
+        elif key not in results:
+            parser = PARSERS.get((provider, fmt)) or partial(FORMAT_PARSERS[fmt], provider=provider)
+            results[key] = None
+            jobs.append((key, parser, data))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) < 2:
+        for key, parser, data in jobs:
+            results[key] = _parse_sheet(parser, data)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = [(key, pool.submit(_parse_sheet, parser, data)) for key, parser, data in jobs]
+            for key, future in futures:
+                results[key] = future.result()
+
+    imported, fresh = {}, {}
+    for row, key in zip(report, keys):
+        models, error = results[key]
+        row['models'] = len(models) if models is not None else 0
+        row['error'] = error
+        if models is not None:
+            imported.setdefault(row['provider'], {}).update(models)
+            fresh[key] = models
+    if cache_path and update_cache and fresh.keys() != cache.keys():
+        try:
+            # Only this import's sheets are kept, so the cache can't grow without bound
+            _atomic_write(cache_path, json.dumps({'parser_version': PARSER_VERSION, 'sheets': fresh}))
+        except OSError:
+            pass
+    return imported, report
+
+def merge_api_pricing(api_pricing, imported, remove_missing=False):
+    """(new api_pricing, changes) with imported models added to or updating the current ones
+
+    Fields a sheet leaves out (usually context and tier) are kept from the
+    current entry. New models missing either are left out and reported as
+    incomplete. Models a provider's sheets don't list are kept unless
+    remove_missing, and even then only when the sheets name at least
+    MIN_MATCHED_SHARE of the provider's current models; otherwise the
+    removal is reported as refused. Providers without sheets are unchanged
+    and no provider is ever left without models.
+    """
+    merged = {provider: dict(models) for provider, models in api_pricing.items()}
+    changes = []
+    for provider, models in imported.items():
+        current = api_pricing.get(provider, {})
+        updated = dict(current)
+        for model, entry in models.items():
+            old = current.get(model)
+            entry = {**(old or {}), **entry}
+            missing = [field for field in PRICE_FIELDS if field not in entry]
+            if missing:
+                changes.append({'change': 'incomplete', 'provider': provider, 'model': model,
+                                'field': ','.join(missing), 'old': None, 'new': None})
+                continue
+            entry = {field: entry[field] for field in PRICE_FIELDS}
+            updated[model] = entry
+            if old is None:
+                changes.append({'change': 'added', 'provider': provider, 'model': model, 'field': None,
+                                'old': None, 'new': entry})
+                continue
+            for field in PRICE_FIELDS:
+                if old.get(field) != entry[field]:
+                    changes.append({'change': 'changed', 'provider': provider, 'model': model, 'field': field,
+                                    'old': old.get(field), 'new': entry[field]})
+        unlisted = [model for model in current if model not in models]
+        if remove_missing and unlisted:
+            matched = len(current) - len(unlisted)
+            if matched >= MIN_MATCHED_SHARE * len(current):
+                for model in unlisted:
+                    del updated[model]
+                    changes.append({'change': 'removed', 'provider': provider, 'model': model, 'field': None,
+                                    'old': current[model], 'new': None})
+            else:
+                changes.append({'change': 'removal_refused', 'provider': provider, 'model': None,
+                                'field': f'{matched}/{len(current)} current models matched', 'old': None,
+                                'new': None})
+        if updated:
+            merged[provider] = updated
+    return merged, changes
+
+def latest_entry(pricing_file):
+    """Newest version entry of a pricing file, or the pricing_data tables when there is no file"""
+    if pricing_file is None or not os.path.exists(pricing_file):
+        return module_pricing_entry()
+    versions = read_pricing_file(pricing_file)
+    return max(versions, key=lambda v: (_day(v.get('effective_date', '0001-01-01')), v['version']))
+
+def import_price_sheets(paths, pricing_file=DEFAULT_PRICING_FILE, version=None, effective_date=None, workers=None,
+                        remove_missing=False, dry_run=False, use_cache=True):
+    """Parse sheets, diff them against the latest pricing version and append a new version
+
+    The new version copies every other table from the latest one. Its name
+    defaults to the effective date plus a hash of its API prices. Nothing is
+    written when there are no changes or with dry_run, which leaves the
+    parse cache untouched too. Returns {'sheets', 'changes', 'version',
+    'written'}.
+    """
+    sheets = discover_sheets(paths)
+    cache_path = pricing_file + CACHE_SUFFIX if use_cache and pricing_file else None
+    imported, report = parse_sheets(sheets, workers, cache_path, update_cache=not dry_run)
+    base = latest_entry(pricing_file)
+    api_pricing, changes = merge_api_pricing(base['api_pricing'], imported, remove_missing)
+    effective_date = _day(effective_date)
+    if version is None:
+        digest = hashlib.sha256(json.dumps(api_pricing, sort_keys=True).encode()).hexdigest()
+        version = f'{effective_date}.{digest[:8]}'
+    written = any(change['change'] in ('added', 'changed', 'removed') for change in changes) and not dry_run
+    if written:
+        # A file created from pricing_data keeps that version too, so earlier dates still resolve
+        versions = read_pricing_file(pricing_file) if os.path.exists(pricing_file) else [base]
+        if any(v['version'] == version for v in versions):
+            raise ValueError(f'{pricing_file} already has a version {version!r}')
+        write_pricing_file(pricing_file, versions + [
+            {**base, 'version': version, 'effective_date': effective_date, 'api_pricing': api_pricing}])
+    return {'sheets': report, 'changes': changes, 'version': version, 'written': written}
@@ -0,0 +1,97 @@
+# pricing_catalog.py
+"""Indexed view of API_PRICING for cheapest-model and tier queries"""
+import heapq
+from bisect import bisect_left
+
+class PricingCatalog:
+    """Models sorted by input price, output price and context, with tier/provider indexes
+
+    Model i is the i-th (provider, model) pair in pricing order; ties in
+    every query are broken by that order, matching a stable sort over a
+    full scan.
+    """
+
+    def __init__(self, api_pricing):
+        self.model_keys = [(provider, model) for provider, models in api_pricing.items() for model in models]
+        self.index = {key: i for i, key in enumerate(self.model_keys)}
+        entries = [api_pricing[p][m] for p, m in self.model_keys]
+        self.input_prices = [entry['input'] for entry in entries]
+        self.output_prices = [entry['output'] for entry in entries]
+        self.contexts = [entry['context'] for entry in entries]
+        self.tiers = [entry['tier'] for entry in entries]
+
+        self.all = self._build_view(range(len(self.model_keys)))
+        self.by_tier = self._group_views(self.tiers)
+        self.by_provider = self._group_views([p for p, _m in self.model_keys])
+
+    def _build_view(self, members):
+        members = list(members)
+        by_context = sorted(members, key=lambda i: (self.contexts[i], i))
+        return {
+            'by_input': sorted(members, key=lambda i: (self.input_prices[i], i)),
+            'by_output': sorted(members, key=lambda i: (self.output_prices[i], i)),
+            'by_context': by_context,
+            'context_keys': [self.contexts[i] for i in by_context],
+        }
+
+    def _group_views(self, labels):
+        groups = {}
+        for i, label in enumerate(labels):
+            groups.setdefault(label, []).append(i)
+        return {label: self._build_view(members) for label, members in groups.items()}
+
+    def _view(self, tier=None, provider=None):
+        if tier is not None and provider is not None:
+            raise ValueError('Filter by tier or provider, not both')
+        if tier is not None:
+            return self.by_tier.get(tier)
+        if provider is not None:
+            return self.by_provider.get(provider)
+        return self.all
+
+    def cost(self, i, input_volume, output_volume):
+        """Cost of model i for token volumes in millions (same arithmetic as calculate_api_cost)"""
+        return input_volume * self.input_prices[i] + output_volume * self.output_prices[i]
+
+    def top_k_cheapest(self, input_volume, output_volume, k=3, tier=None, provider=None, min_context=0):
+        """k cheapest models for an input:output mix as sorted (cost, index) pairs
+
+        Threshold query over the input- and output-sorted lists: walk both
+        in step, keep the best k in a bounded heap and stop once no unseen
+        model can beat the k-th best. A min_context met by only a few models
+        of the view is answered from the context-sorted list instead, since
+        the walk would skip past most of the view.
+        """
+        view = self._view(tier, provider)
+        if view is None or k <= 0:
+            return []
+        by_input, by_output = view['by_input'], view['by_output']
+        contexts, cost = self.contexts, self.cost
+        if min_context > 0:
+            first = bisect_left(view['context_keys'], min_context)
+            # The walk sees about k * n / m models before it has k of the m
+            # eligible ones; ranking those m directly wins when m is smaller
+            if (len(by_input) - first) ** 2 <= 2 * k * len(by_input):
+                return heapq.nsmallest(k, ((cost(i, input_volume, output_volume), i)
+                                           for i in view['by_context'][first:]))
+        heap = []  # max-heap of the best k via negated (cost, index)
+        seen = set()
+        for depth in range(len(by_input)):
+            for i in (by_input[depth], by_output[depth]):
+                if i in seen:
+                    continue
+                seen.add(i)
+                if contexts[i] < min_context:
+                    continue
+                item = (-cost(i, input_volume, output_volume), -i)
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+            # Any unseen model costs at least the cost of the two cursors' prices
+            if len(heap) == k:
+                threshold = (input_volume * self.input_prices[by_input[depth]]
+                             + output_volume * self.output_prices[by_output[depth]])
+                if -heap[0][0] < threshold:
+                    break
+        return sorted((-c, -i) for c, i in heap)
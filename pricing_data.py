@@ -4,6 +4,9 @@ All AI service pricing (updated October 2025)
 Prices in USD per 1M tokens
 """
 
+# Bump whenever any table below changes; caches key on it
+PRICING_VERSION = '2025-10'
+
 # API Services (per 1M tokens)
 API_PRICING = {
     'openai': {
@@ -70,6 +73,29 @@ TEAM_SUBS = {
     'claude_team': 30,
 }
 
+# Prompt caching (fraction of the input price): cached reads are discounted,
+# cache writes may carry a premium
+PROMPT_CACHING = {
+    'openai': {'read_discount': 0.50, 'write_premium': 0.0},
+    'anthropic': {'read_discount': 0.90, 'write_premium': 0.25},
+    'google': {'read_discount': 0.75, 'write_premium': 0.0},
+    'deepseek': {'read_discount': 0.90, 'write_premium': 0.0},
+    'mistral': {'read_discount': 0.0, 'write_premium': 0.0},
+    'cohere': {'read_discount': 0.0, 'write_premium': 0.0},
+    'xai': {'read_discount': 0.75, 'write_premium': 0.0},
+}
+
+# Batch API discount on input and output tokens
+BATCH_DISCOUNTS = {
+    'openai': 0.50,
+    'anthropic': 0.50,
+    'google': 0.50,
+    'deepseek': 0.0,
+    'mistral': 0.50,
+    'cohere': 0.0,
+    'xai': 0.0,
+}
+
 # Use case routing rules
 USE_CASE_ROUTING = {
     'customer_support': {'simple': 0.70, 'medium': 0.20, 'complex': 0.10},
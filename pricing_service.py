@@ -0,0 +1,221 @@
+# pricing_service.py
+"""Standalone asyncio HTTP/JSON pricing service
+
+Endpoints:
+    GET  /health
+    GET  /metrics          Prometheus text; needs AI_COST_INSTRUMENT=1
+    POST /cost             {"provider", "model", "input_tokens", "output_tokens", "calls"?}
+    POST /cost/batch       {"requests": [<cost request>, ...]}
+    POST /recommendations  {"provider", "model", "monthly_calls", "avg_input_tokens",
+                            "avg_output_tokens", "use_case", "dev_tools"?}
+
+Only the calculator and pricing tables are imported, never streamlit or
+plotly, so the service starts fast and keeps requests on the hot path.
+"""
+import argparse
+import asyncio
+import json
+import math
+
+import numpy as np
+
+import instrumentation
+from calculator import active_pricing, optimize_api_usage, analyze_dev_tools, generate_summary_report
+from pricing_store import default_store
+from records import to_json
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+
+class RequestError(Exception):
+    """Client error mapped to an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _model_index(tables, provider, model):
+    try:
+        return tables['price_matrix']['index'][(provider, model)]
+    except KeyError:
+        raise RequestError(400, f'Unknown model {provider}/{model}') from None
+
+def _number(payload, key, default):
+    """A finite, non-negative number field of a request"""
+    value = payload.get(key, default)
+    try:
+        valid = not isinstance(value, bool) and isinstance(value, (int, float)) and math.isfinite(value) and value >= 0
+    except OverflowError:
+        # JSON integers are unbounded; ones past the float range can't be priced
+        valid = False
+    if not valid:
+        raise RequestError(400, f'{key} must be a finite, non-negative number')
+    return value
+
+def price_call(payload):
+    """Cost of one call (or `calls` identical calls)"""
+    tables = active_pricing()
+    try:
+        i = _model_index(tables, payload['provider'], payload['model'])
+        calls = _number(payload, 'calls', 1)
+        input_volume = calls * _number(payload, 'input_tokens', 0) / 1_000_000
+        output_volume = calls * _number(payload, 'output_tokens', 0) / 1_000_000
+    except (KeyError, TypeError, AttributeError) as exc:
+        raise RequestError(400, f'Invalid cost request: {exc}') from None
+    cost = tables['catalog'].cost(i, input_volume, output_volume)
+    return {'provider': payload['provider'], 'model': payload['model'], 'cost': cost, 'pricing_version': tables['version']}
+
+def price_batch(payload):
+    """Costs of many calls in one vectorised pass"""
+    tables = active_pricing()
+    requests = payload.get('requests') if isinstance(payload, dict) else payload
+    if not isinstance(requests, list):
+        raise RequestError(400, 'Batch body must be a list or {"requests": [...]}')
+    try:
+        idx = np.fromiter((_model_index(tables, r['provider'], r['model']) for r in requests), dtype=np.intp, count=len(requests))
+        calls = np.fromiter((_number(r, 'calls', 1) for r in requests), dtype=np.float64, count=len(requests))
+        input_tokens = np.fromiter((_number(r, 'input_tokens', 0) for r in requests), dtype=np.float64, count=len(requests))
+        output_tokens = np.fromiter((_number(r, 'output_tokens', 0) for r in requests), dtype=np.float64, count=len(requests))
+    except (KeyError, TypeError, AttributeError, ValueError) as exc:
+        raise RequestError(400, f'Invalid batch request: {exc}') from None
+    prices = tables['price_matrix']['prices']
+    costs = (calls * input_tokens / 1_000_000) * prices[0, idx] + (calls * output_tokens / 1_000_000) * prices[1, idx]
+    return {'costs': costs.tolist(), 'total_cost': float(costs.sum()), 'pricing_version': tables['version']}
+
+def recommendations(payload):
+    """API and developer tool recommendations with a summary report"""
+    all_recommendations = []
+    try:
+        if _number(payload, 'monthly_calls', 0) > 0:
+            _model_index(active_pricing(), payload['provider'], payload['model'])
+            all_recommendations.extend(optimize_api_usage(
+                payload['provider'], payload['model'], payload['monthly_calls'],
+                _number(payload, 'avg_input_tokens', 0), _number(payload, 'avg_output_tokens', 0),
+                payload.get('use_case'),
+            ))
+        all_recommendations.extend(analyze_dev_tools(payload.get('dev_tools', {})))
+    except (KeyError, TypeError, AttributeError) as exc:
+        raise RequestError(400, f'Invalid recommendations request: {exc}') from None
+    return generate_summary_report(all_recommendations)
+
+ROUTES = {
+    '/cost': price_call,
+    '/cost/batch': price_batch,
+    '/recommendations': recommendations,
+}
+
+def _response(status, body, keep_alive):
+    if isinstance(body, str):
+        payload, content_type = body.encode(), 'text/plain; version=0.0.4'
+    else:
+        try:
+            payload = json.dumps(body, separators=(',', ':'), default=to_json, allow_nan=False).encode()
+        except ValueError:
+            # Finite inputs can still overflow to inf; NaN and Infinity aren't JSON
+            status, payload = 400, b'{"error":"Result is not a finite number; inputs are too large"}'
+        content_type = 'application/json'
+    head = (
+        f'HTTP/1.1 {status} {REASONS.get(status, "Error")}\r\n'
+        f'Content-Type: {content_type}\r\nContent-Length: {len(payload)}\r\n'
+        f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'
+    )
+    return head.encode() + payload
+
+def _reject_constant(name):
+    raise ValueError(f'{name} is not a valid number')
+
+def dispatch(method, path, body):
+    """Route one request; returns (status, body), body being JSON-serialisable or /metrics text"""
+    path = path.split('?', 1)[0]
+    if path == '/health':
+        return 200, {'status': 'ok', 'pricing_version': active_pricing()['version']}
+    if path == '/metrics':
+        if not instrumentation.enabled():
+            return 404, {'error': 'Instrumentation is disabled; set AI_COST_INSTRUMENT=1'}
+        return 200, instrumentation.to_prometheus()
+    handler = ROUTES.get(path)
+    if handler is None:
+        return 404, {'error': f'No route for {path}'}
+    if method != 'POST':
+        return 405, {'error': f'{path} expects POST'}
+    instrumentation.count(f'service{path}')
+    try:
+        payload = json.loads(body or b'{}', parse_constant=_reject_constant)
+    except ValueError as exc:
+        return 400, {'error': f'Invalid JSON: {exc}'}
+    if not isinstance(payload, (dict, list)):
+        return 400, {'error': 'Request body must be a JSON object or list'}
+    try:
+        return 200, handler(payload)
+    except RequestError as exc:
+        return exc.status, {'error': str(exc)}
+    except (ValueError, OverflowError) as exc:
+        return 400, {'error': f'Invalid request: {exc}'}
+    except Exception:
+        # Answer rather than drop the connection; the client can't fix this one
+        instrumentation.count('service.errors')
+        return 500, {'error': 'Internal server error'}
+
+async def handle_connection(reader, writer):
+    """Serve HTTP/1.1 requests on one keep-alive connection"""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            lines = head.decode('latin-1').split('\r\n')
+            try:
+                method, path, version = lines[0].split(' ', 2)
+            except ValueError:
+                writer.write(_response(400, {'error': 'Malformed request line'}, False))
+                return
+            headers = {}
+            for line in lines[1:]:
+                name, sep, value = line.partition(':')
+                if sep:
+                    headers[name.strip().lower()] = value.strip()
+            keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+            try:
+                length = int(headers.get('content-length') or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                writer.write(_response(400, {'error': 'Invalid Content-Length'}, False))
+                return
+            if length > MAX_BODY_BYTES:
+                writer.write(_response(413, {'error': 'Body too large'}, False))
+                return
+            body = await reader.readexactly(length) if length else b''
+            status, result = dispatch(method, path, body)
+            writer.write(_response(status, result, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                return
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return
+    finally:
+        writer.close()
+
+async def serve(host='127.0.0.1', port=8080):
+    """Preload pricing and serve until cancelled"""
+    default_store()
+    # The price matrix is built lazily; build it now rather than on the first request
+    active_pricing()['price_matrix']
+    server = await asyncio.start_server(handle_connection, host, port)
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='AI cost pricing service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
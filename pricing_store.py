@@ -0,0 +1,259 @@
+# pricing_store.py
+"""Versioned, hot-reloadable pricing loaded from a JSON file
+
+File layout:
+    {"format": 1, "versions": [{"version": "2025-10", "effective_date": "2025-10-01",
+      "api_pricing": {...}, "dev_tools": {...}, "team_subs": {...}, "use_case_routing": {...},
+      "prompt_caching": {...}, "batch_discounts": {...}}]}
+
+The file is re-parsed on every change; the tables are small, and keeping
+no derived cache means snapshots always match the running code.
+"""
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+from bisect import bisect_right
+from datetime import date, datetime, timezone
+
+import pricing_data
+from calculator import active_pricing, build_pricing_tables, install_pricing
+
+FILE_FORMAT = 1
+DEFAULT_PRICING_FILE = os.environ.get('AI_COST_PRICING_FILE', 'pricing.json')
+
+class PricingSnapshot:
+    """One immutable pricing version and the date it took effect"""
+
+    __slots__ = ('version', 'effective_date', 'tables')
+
+    def __init__(self, version, effective_date, tables):
+        self.version = version
+        self.effective_date = effective_date
+        self.tables = tables
+
+    def __repr__(self):
+        return f'PricingSnapshot({self.version!r}, effective {self.effective_date})'
+
+_epoch_day_cache = {}
+_OFFSET = re.compile(r'([+-])(\d{2}):?(\d{2})$')
+
+def utc_day(when):
+    """YYYY-MM-DD UTC day of a date, datetime, epoch seconds or ISO-8601 string; None if unparseable
+
+    Naive datetimes and ISO strings without an offset are taken as UTC.
+    """
+    if isinstance(when, datetime):
+        return when.astimezone(timezone.utc).date().isoformat() if when.tzinfo else when.date().isoformat()
+    if isinstance(when, date):
+        return when.isoformat()
+    if isinstance(when, str):
+        if len(when) >= 10 and when[4] == '-':
+            # Only strings with a non-zero offset need converting
+            offset = _OFFSET.search(when, 10)
+            if offset is None or offset.group(2) == '00' and offset.group(3) == '00':
+                return when[:10]
+            try:
+                return datetime.fromisoformat(when).astimezone(timezone.utc).strftime('%Y-%m-%d')
+            except ValueError:
+                return None
+        try:
+            when = float(when)
+        except ValueError:
+            return None
+    if isinstance(when, bool) or not isinstance(when, (int, float)) or not math.isfinite(when):
+        return None
+    epoch_day = int(when // 86400)
+    day = _epoch_day_cache.get(epoch_day)
+    if day is None:
+        try:
+            day = datetime.fromtimestamp(epoch_day * 86400, tz=timezone.utc).strftime('%Y-%m-%d')
+        except (OverflowError, ValueError, OSError):
+            return None
+        _epoch_day_cache[epoch_day] = day
+    return day
+
+def _day(when):
+    """utc_day of when, today for None"""
+    if when is None:
+        return date.today().isoformat()
+    day = utc_day(when)
+    if day is None:
+        raise ValueError(f'Not a date or timestamp: {when!r}')
+    return day
+
+def snapshot_from_dict(entry):
+    """Build a PricingSnapshot from one version entry of the pricing file"""
+    try:
+        tables = build_pricing_tables(
+            entry['api_pricing'],
+            entry.get('dev_tools', {}),
+            entry.get('team_subs', {}),
+            entry.get('use_case_routing', {}),
+            entry['version'],
+            entry.get('prompt_caching'),
+            entry.get('batch_discounts'),
+        )
+    except KeyError as exc:
+        raise ValueError(f'Pricing version entry is missing {exc}') from None
+    return PricingSnapshot(entry['version'], _day(entry.get('effective_date', '0001-01-01')), tables)
+
+def module_pricing_entry(effective_date='0001-01-01'):
+    """Version entry for the tables hard-coded in pricing_data"""
+    return {
+        'version': pricing_data.PRICING_VERSION,
+        'effective_date': effective_date,
+        'api_pricing': pricing_data.API_PRICING,
+        'dev_tools': pricing_data.DEV_TOOLS,
+        'team_subs': pricing_data.TEAM_SUBS,
+        'use_case_routing': pricing_data.USE_CASE_ROUTING,
+        'prompt_caching': pricing_data.PROMPT_CACHING,
+        'batch_discounts': pricing_data.BATCH_DISCOUNTS,
+    }
+
+def _atomic_write(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.pricing-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+            handle.write(data)
+        # mkstemp creates 0600 files; services under other accounts must be able to read pricing
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def write_pricing_file(path, versions):
+    """Write version entries to a pricing file atomically"""
+    versions = sorted(versions, key=lambda v: (_day(v.get('effective_date', '0001-01-01')), v['version']))
+    _atomic_write(path, json.dumps({'format': FILE_FORMAT, 'versions': versions}, indent=1))
+
+def read_pricing_file(path):
+    """Version entries of a pricing file"""
+    with open(path, 'r', encoding='utf-8') as handle:
+        document = json.load(handle)
+    if document.get('format') != FILE_FORMAT:
+        raise ValueError(f'Unsupported pricing file format: {document.get("format")!r}')
+    return document['versions']
+
+def load_snapshots(path):
+    """Parse a pricing file into snapshots ordered by effective date"""
+    snapshots = sorted(
+        (snapshot_from_dict(entry) for entry in read_pricing_file(path)),
+        key=lambda s: s.effective_date,
+    )
+    if not snapshots:
+        raise ValueError(f'{path} contains no pricing versions')
+    return snapshots
+
+class PricingStore:
+    """Holds every pricing version of a file and swaps in new ones as the file changes
+
+    Readers never block: the snapshot list is replaced wholesale, and
+    calculations keep the tables they started with.
+    """
+
+    def __init__(self, path=DEFAULT_PRICING_FILE, activate=True):
+        self.path = path
+        self.activate = activate
+        self.last_error = None
+        self.reloads = 0
+        self._snapshots = ((), ())
+        self._stamp = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        if path is None:
+            self._publish([snapshot_from_dict(module_pricing_entry())])
+        else:
+            self.reload()
+
+    @classmethod
+    def from_module(cls):
+        """In-memory store holding only the pricing_data tables"""
+        return cls(path=None, activate=False)
+
+    def _publish(self, snapshots):
+        # Single attribute swap; readers see either the old or the new tuple
+        self._snapshots = (tuple(snapshots), tuple(s.effective_date for s in snapshots))
+
+    def reload(self):
+        """Reload the file if it changed; returns True when a new version set was installed"""
+        if self.path is None:
+            return False
+        with self._reload_lock:
+            stat = os.stat(self.path)
+            stamp = (stat.st_size, stat.st_mtime_ns)
+            if stamp == self._stamp:
+                return False
+            snapshots = load_snapshots(self.path)
+            self._publish(snapshots)
+            self._stamp = stamp
+            self.reloads += 1
+            if self.activate:
+                install_pricing(self.current().tables)
+            return True
+
+    def snapshots(self):
+        return list(self._snapshots[0])
+
+    def at(self, when=None):
+        """Snapshot in effect on a date, datetime, epoch timestamp or ISO string
+
+        Dates before the first version fall back to the earliest one.
+        """
+        snapshots, dates = self._snapshots
+        i = bisect_right(dates, _day(when)) - 1
+        return snapshots[max(i, 0)]
+
+    def current(self):
+        return self.at(None)
+
+    def version(self, version):
+        for snapshot in self._snapshots[0]:
+            if snapshot.version == version:
+                return snapshot
+        raise KeyError(version)
+
+    def watch(self, interval=2.0):
+        """Poll the file in a daemon thread and hot-swap new versions"""
+        if self._watcher is not None or self.path is None:
+            return self
+        self._stop.clear()
+
+        def poll():
+            while not self._stop.wait(interval):
+                try:
+                    self.reload()
+                    self.last_error = None
+                    # A version whose effective date has just arrived takes over
+                    if self.activate and active_pricing() is not self.current().tables:
+                        install_pricing(self.current().tables)
+                except (OSError, ValueError, KeyError, TypeError) as exc:
+                    # Keep serving the last good snapshot
+                    self.last_error = exc
+
+        self._watcher = threading.Thread(target=poll, name='pricing-store-watch', daemon=True)
+        self._watcher.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def default_store(path=DEFAULT_PRICING_FILE, watch_interval=2.0):
+    """Process-wide watching store for path, or None if the file doesn't exist"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None and os.path.exists(path):
+            _default_store = PricingStore(path).watch(watch_interval)
+        return _default_store
@@ -0,0 +1,224 @@
+# records.py
+"""Compact workload and recommendation records
+
+Both are __slots__ objects that also behave as read-only mappings with the
+same keys as the dicts they replace, so templates and callers that index
+them (app.py, the CLI, the service) keep working. Recommendation text is
+rendered from its kind's template only when a title, description or
+implementation is read.
+"""
+from collections.abc import Mapping
+
+class Workload(Mapping):
+    """One API workload, shaped like optimize_api_usage's arguments"""
+
+    __slots__ = ('provider', 'model', 'use_case', 'monthly_calls', 'avg_input_tokens', 'avg_output_tokens')
+    _KEYS = __slots__
+
+    def __init__(self, provider, model, monthly_calls, avg_input_tokens, avg_output_tokens, use_case=None):
+        self.provider = provider
+        self.model = model
+        self.use_case = use_case
+        self.monthly_calls = monthly_calls
+        self.avg_input_tokens = avg_input_tokens
+        self.avg_output_tokens = avg_output_tokens
+
+    @classmethod
+    def from_mapping(cls, row):
+        return cls(row['provider'], row['model'], row.get('monthly_calls', 0), row.get('avg_input_tokens', 0),
+                   row.get('avg_output_tokens', 0), row.get('use_case'))
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def __repr__(self):
+        return (f'Workload({self.provider!r}, {self.model!r}, {self.monthly_calls!r}, {self.avg_input_tokens!r}, '
+                f'{self.avg_output_tokens!r}, use_case={self.use_case!r})')
+
+def _product(name):
+    return name.replace('_', ' ').title()
+
+def _routes(rec):
+    use_case, assignments = rec.args
+    return ', '.join(f'{a["bucket"]} ({a["share"]:.0%}) → {a["model"]}' for a in assignments)
+
+def _routing_steps(rec):
+    use_case, assignments = rec.args
+    steps = '\n'.join(
+        f'{n}. Route {a["bucket"]} requests to {a["provider"].title()} {a["model"]}'
+        for n, a in enumerate(assignments, 1)
+    )
+    n = len(assignments)
+    return f'{steps}\n{n + 1}. Add a complexity classifier in front of the API\n{n + 2}. Monitor quality per bucket'
+
+# kind -> category, effort and title/description/implementation renderers
+TEMPLATES = {
+    'switch': {
+        'effort': 'Low',
+        'title': lambda r: f'Switch to {r.args[0].title()} {r.args[1]}',
+        'description': lambda r: f'Save {(r.monthly_savings / r.current_cost) * 100:.0f}% by switching providers',
+        'implementation': lambda r: f'1. Sign up for {r.args[0].title()} API\n2. Update API endpoint\n'
+                                    f'3. Test with 10% of traffic\n4. Monitor quality\n5. Scale to 100%',
+    },
+    'routing': {
+        'effort': 'Medium',
+        'title': lambda r: f'Route {r.args[0].replace("_", " ")} traffic by complexity',
+        'description': lambda r: f'Save {r.monthly_savings / r.current_cost * 100:.0f}% with a tiered mix: {_routes(r)}',
+        'implementation': _routing_steps,
+    },
+    'caching': {
+        'effort': 'Low',
+        'title': lambda r: 'Enable prompt caching',
+        'description': lambda r: 'Cache repeated prompts to reduce costs 30-50%',
+        'implementation': lambda r: 'Add caching parameters to API calls. Typical savings: 30-50%',
+    },
+    'caching_long_prompts': {
+        'effort': 'Low',
+        'title': lambda r: 'Enable prompt caching',
+        'description': lambda r: f'{r.args[0]:.0%} of input tokens are in prompts over 1,000 tokens',
+        'implementation': lambda r: 'Add caching parameters to API calls for long prompts. Typical savings: 30-50%',
+    },
+    'caching_measured': {
+        'effort': 'Low',
+        'title': lambda r: 'Enable prompt caching',
+        'description': lambda r: f'Measured {r.args[0]:.0%} prefix cache hit rate; cached input is '
+                                 f'{r.args[1]:.0%} cheaper',
+        'implementation': lambda r: 'Put shared instructions and context first in prompts and add caching '
+                                    'parameters to API calls',
+    },
+    'batch': {
+        'effort': 'Medium',
+        'title': lambda r: 'Use Batch API (50% discount)',
+        'description': lambda r: 'Process non-urgent tasks overnight',
+        'implementation': lambda r: 'Identify non-urgent tasks and submit as batch jobs',
+    },
+    'batch_measured': {
+        'effort': 'Medium',
+        'title': lambda r: f'Use Batch API ({r.args[0]:.0%} discount)',
+        'description': lambda r: f'{r.args[1]:.0%} of requests are batch-eligible',
+        'implementation': lambda r: 'Submit batch-eligible requests as batch jobs',
+    },
+    'dev_seats': {
+        'category': 'Developer Tools',
+        'effort': 'Low',
+        'title': lambda r: f'Remove {r.args[1]} unused {r.args[0].replace("_", " ").title()} seats',
+        'description': lambda r: f'Only {r.args[2]} of {r.args[3]} seats active',
+        'implementation': lambda r: 'Review usage logs and remove inactive users',
+    },
+    # Seat findings from seat_optimizer; args are (product, seats, tier, users[, target tier])
+    'idle_seats': {
+        'category': 'Developer Tools',
+        'effort': 'Low',
+        'title': lambda r: f'Remove {r.args[1]} idle {_product(r.args[0])} {r.args[2]} seats',
+        'description': lambda r: f'{r.args[1]} users had no activity in the review window',
+        'implementation': lambda r: f'1. Confirm with the {r.args[1]} idle users\n2. Reclaim their seats\n'
+                                    f'3. Re-check activity monthly',
+    },
+    'duplicate_seats': {
+        'category': 'Developer Tools',
+        'effort': 'Low',
+        'title': lambda r: f'Remove {r.args[1]} duplicate {_product(r.args[0])} {r.args[2]} seats',
+        'description': lambda r: f'{r.args[1]} users also hold a more used seat on a similar tool',
+        'implementation': lambda r: '1. Keep each user on the tool they use most\n2. Reclaim the other seats',
+    },
+    'tier_downgrade': {
+        'category': 'Developer Tools',
+        'effort': 'Low',
+        'title': lambda r: f'Move {r.args[1]} light {_product(r.args[0])} users from {r.args[2]} to {r.args[4]}',
+        'description': lambda r: f'{r.args[1]} users are active only a few days a month',
+        'implementation': lambda r: f'1. Reassign the {r.args[1]} light users to the {r.args[4]} tier\n'
+                                    f'2. Restore {r.args[2]} on request',
+    },
+}
+
+_KEYS = ('title', 'description', 'current_cost', 'optimized_cost', 'monthly_savings', 'annual_savings', 'effort',
+         'implementation')
+_CATEGORY_KEYS = ('category',) + _KEYS
+_FIELDS = frozenset(_KEYS)
+
+class Recommendation(Mapping):
+    """A savings recommendation whose text is rendered from TEMPLATES on demand
+
+    args are the kind's template arguments (e.g. provider and model for
+    'switch'). Indexing gives the same keys and values as the legacy dicts;
+    to_dict() materialises one.
+    """
+
+    __slots__ = ('kind', 'args', 'current_cost', 'optimized_cost', 'monthly_savings', 'annual_savings')
+
+    def __init__(self, kind, current_cost, optimized_cost, monthly_savings, *args):
+        if kind not in TEMPLATES:
+            raise ValueError(f'Unknown recommendation kind {kind!r}')
+        self.kind = kind
+        self.args = args
+        self.current_cost = current_cost
+        self.optimized_cost = optimized_cost
+        self.monthly_savings = monthly_savings
+        # Stored rather than derived: summaries read it for every record
+        self.annual_savings = monthly_savings * 12
+
+    @property
+    def category(self):
+        return TEMPLATES[self.kind].get('category')
+
+    @property
+    def effort(self):
+        return TEMPLATES[self.kind]['effort']
+
+    @property
+    def title(self):
+        return TEMPLATES[self.kind]['title'](self)
+
+    @property
+    def description(self):
+        return TEMPLATES[self.kind]['description'](self)
+
+    @property
+    def implementation(self):
+        return TEMPLATES[self.kind]['implementation'](self)
+
+    def _keys(self):
+        return _CATEGORY_KEYS if 'category' in TEMPLATES[self.kind] else _KEYS
+
+    def __getitem__(self, key):
+        if key in _FIELDS:
+            return getattr(self, key)
+        if key == 'category' and 'category' in TEMPLATES[self.kind]:
+            return TEMPLATES[self.kind]['category']
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        # Mapping.get goes through __getitem__ and an exception; summaries call this per record
+        if key in _FIELDS:
+            return getattr(self, key)
+        return TEMPLATES[self.kind].get('category', default) if key == 'category' else default
+
+    def __contains__(self, key):
+        return key in _FIELDS or (key == 'category' and 'category' in TEMPLATES[self.kind])
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self._keys()}
+
+    def __repr__(self):
+        return (f'Recommendation({self.kind!r}, {self.current_cost!r}, {self.optimized_cost!r}, '
+                f'{self.monthly_savings!r}{"".join(f", {a!r}" for a in self.args)})')
+
+def to_json(value):
+    """json.dumps default= hook that serialises records as plain dicts"""
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
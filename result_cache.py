@@ -0,0 +1,145 @@
+# result_cache.py
+"""Bounded LRU + TTL memoization for pure calculator results
+
+The cache lives at module level, so Streamlit reruns and sessions in the
+same process share it. Returned objects are shared too: treat them as
+read-only.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from calculator import (
+    active_pricing,
+    calculate_api_cost,
+    optimize_api_usage,
+    analyze_dev_tools,
+    generate_summary_report
+)
+
+def current_pricing_version():
+    """Version tag and serial of the pricing tables currently in effect
+
+    The serial changes on every reload, so prices edited in place under an
+    unchanged version tag still invalidate cached results.
+    """
+    tables = active_pricing()
+    return (tables['version'], tables.serial)
+
+class LRUCache:
+    """Thread-safe LRU cache with per-entry TTL and version-based invalidation"""
+
+    def __init__(self, maxsize=1024, ttl=3600, version_fn=current_pricing_version, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version_fn = version_fn
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self):
+        version = self.version_fn() if self.version_fn else None
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss"""
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            version = self._version
+        # Compute outside the lock so slow analyses don't serialise readers
+        value = compute()
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = (self.clock() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'pricing_version': self._version,
+            }
+
+RESULT_CACHE = LRUCache()
+
+def _number(value):
+    """Normalise numeric inputs so 500 and 500.0 share a cache entry"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+def _workload_key(provider, model, monthly_calls, avg_input_tokens, avg_output_tokens):
+    return (provider, model, _number(monthly_calls), _number(avg_input_tokens), _number(avg_output_tokens))
+
+def _seat_key(tools_usage):
+    # analyze_dev_tools ignores tools without seats, so they don't affect the key
+    return tuple(sorted(
+        (tool, _number(usage['total_seats']), _number(usage.get('active_seats', usage['total_seats'])))
+        for tool, usage in tools_usage.items()
+        if usage['total_seats']
+    ))
+
+def cached_api_cost(provider, model, monthly_calls, avg_input_tokens, avg_output_tokens, cache=RESULT_CACHE):
+    """Memoized calculate_api_cost"""
+    key = ('api_cost',) + _workload_key(provider, model, monthly_calls, avg_input_tokens, avg_output_tokens)
+    return cache.get_or_compute(key, lambda: calculate_api_cost(
+        provider, model, monthly_calls, avg_input_tokens, avg_output_tokens))
+
+def cached_optimize_api_usage(provider, model, monthly_calls, avg_input_tokens, avg_output_tokens, use_case,
+                              cache=RESULT_CACHE):
+    """Memoized optimize_api_usage"""
+    key = ('optimize_api_usage',) + _workload_key(
+        provider, model, monthly_calls, avg_input_tokens, avg_output_tokens) + (use_case,)
+    return cache.get_or_compute(key, lambda: optimize_api_usage(
+        provider, model, monthly_calls, avg_input_tokens, avg_output_tokens, use_case))
+
+def cached_analyze_dev_tools(tools_usage, cache=RESULT_CACHE):
+    """Memoized analyze_dev_tools"""
+    key = ('analyze_dev_tools', _seat_key(tools_usage))
+    return cache.get_or_compute(key, lambda: analyze_dev_tools(tools_usage))
+
+def cached_analysis(provider, model, monthly_calls, avg_input_tokens, avg_output_tokens, use_case, tools_usage,
+                    cache=RESULT_CACHE):
+    """Memoized full analysis: API and developer tool recommendations plus summary report"""
+    key = ('analysis',) + _workload_key(
+        provider, model, monthly_calls, avg_input_tokens, avg_output_tokens) + (use_case, _seat_key(tools_usage))
+
+    def compute():
+        all_recommendations = []
+        if monthly_calls > 0:
+            all_recommendations.extend(cached_optimize_api_usage(
+                provider, model, monthly_calls, avg_input_tokens, avg_output_tokens, use_case, cache=cache))
+        all_recommendations.extend(cached_analyze_dev_tools(tools_usage, cache=cache))
+        return generate_summary_report(all_recommendations)
+
+    return cache.get_or_compute(key, compute)
@@ -0,0 +1,81 @@
+# routing.py
+"""Tiered model mixes from USE_CASE_ROUTING complexity splits"""
+from records import Recommendation
+
+# Tiers each complexity bucket may be routed to
+BUCKET_TIERS = {
+    'simple': ('ultra-budget', 'budget'),
+    'medium': ('mid',),
+    'complex': ('premium',),
+}
+
+def _cheapest_in_tiers(catalog, tiers, input_volume, output_volume, min_context, provider=None):
+    """(cost, model index) of the cheapest eligible model across tiers, or None"""
+    best = None
+    for tier in tiers:
+        if provider is None:
+            ranked = catalog.top_k_cheapest(input_volume, output_volume, 1, tier=tier, min_context=min_context)
+        else:
+            # Provider views are small; filter the provider's models by tier directly
+            ranked = sorted(
+                (catalog.cost(i, input_volume, output_volume), i)
+                for i in catalog.by_provider.get(provider, {}).get('by_input', ())
+                if catalog.tiers[i] == tier and catalog.contexts[i] >= min_context
+            )[:1]
+        if ranked and (best is None or ranked[0] < best):
+            best = ranked[0]
+    return best
+
+def optimize_routing(catalog, routing, monthly_calls, avg_input_tokens, avg_output_tokens,
+                     min_context=0, single_provider=False, bucket_tokens=None):
+    """Cheapest per-bucket model assignment for a use case's complexity split
+
+    Bucket costs are independent, so the cheapest mix is the cheapest
+    eligible model per bucket: one indexed top-1 query per bucket and tier.
+    With single_provider, every bucket must use the same provider and the
+    search runs per provider, keeping the cheapest complete mix.
+    Returns {'cost', 'assignments': [{bucket, share, provider, model, cost}]} or None.
+    """
+    buckets = []
+    for bucket, share in routing.items():
+        if share <= 0:
+            continue
+        input_tokens, output_tokens = (bucket_tokens or {}).get(bucket, (avg_input_tokens, avg_output_tokens))
+        calls = monthly_calls * share
+        buckets.append((bucket, share, calls * input_tokens / 1_000_000, calls * output_tokens / 1_000_000,
+                        max(min_context, input_tokens + output_tokens)))
+
+    def plan(provider=None, bound=None):
+        assignments, total = [], 0.0
+        for bucket, share, input_volume, output_volume, context in buckets:
+            best = _cheapest_in_tiers(catalog, BUCKET_TIERS.get(bucket, ()), input_volume, output_volume,
+                                      context, provider)
+            if best is None:
+                return None
+            cost, i = best
+            alt_provider, alt_model = catalog.model_keys[i]
+            assignments.append({'bucket': bucket, 'share': share, 'provider': alt_provider,
+                                'model': alt_model, 'cost': cost})
+            total += cost
+            # Branch and bound: stop once this mix can't beat the best one found
+            if bound is not None and total >= bound:
+                return None
+        return {'cost': total, 'assignments': assignments}
+
+    if not buckets:
+        return None
+    if not single_provider:
+        return plan()
+    best = None
+    for provider in catalog.by_provider:
+        candidate = plan(provider, best['cost'] if best else None)
+        if candidate is not None:
+            best = candidate
+    return best
+
+def routing_recommendation(use_case, current_cost, result):
+    """Recommendation for a routing result, or None if it saves nothing"""
+    if result is None or result['cost'] >= current_cost:
+        return None
+    savings = current_cost - result['cost']
+    return Recommendation('routing', current_cost, result['cost'], savings, use_case, result['assignments'])
@@ -0,0 +1,169 @@
+# seat_optimizer.py
+"""Fleet-wide developer-tool seat optimisation from per-user activity exports
+
+Exports are CSV or JSONL with one seat per line:
+    user, tool, tier, last_active, active_days
+
+tool is a DEV_TOOLS key (tier names its plan) or a TEAM_SUBS key such as
+chatgpt_team, which is read as product chatgpt on tier team. tier may be
+left empty to mean the product's default business/pro plan, as in
+analyze_dev_tools. active_days counts days with activity in the export
+period and is optional.
+
+Seats are joined to prices through a (product, tier) index and grouped by
+user in one pass, so the work is linear in the number of seats.
+"""
+import csv
+import json
+from datetime import date, datetime, timezone
+
+from calculator import active_pricing
+from records import Recommendation
+
+SEAT_FIELDS = ('user', 'tool', 'tier', 'last_active', 'active_days')
+DEFAULT_IDLE_DAYS = 30
+DEFAULT_LIGHT_USAGE_DAYS = 4
+# Personal plans can't be assigned to managed seats
+EXCLUDED_TIERS = frozenset({'individual'})
+EXCLUDED_PLANS = frozenset({('chatgpt', 'plus'), ('claude', 'pro')})
+
+def build_seat_index(dev_tools, team_subs):
+    """Price index {(product, tier): price}, category per product and each product's cheapest managed tier"""
+    prices, categories = {}, {}
+    for tool, tiers in dev_tools.items():
+        categories[tool] = 'coding'
+        for tier, price in tiers.items():
+            prices[(tool, tier)] = price
+    for plan, price in team_subs.items():
+        product, _, tier = plan.partition('_')
+        categories[product] = 'chat'
+        prices[(product, tier)] = price
+    cheapest = {}
+    for (product, tier), price in prices.items():
+        if tier in EXCLUDED_TIERS or (product, tier) in EXCLUDED_PLANS:
+            continue
+        if product not in cheapest or price < prices[(product, cheapest[product])]:
+            cheapest[product] = tier
+    return {'prices': prices, 'categories': categories, 'cheapest_tier': cheapest}
+
+def _as_date(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc).date()
+    text = str(value)
+    try:
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        return datetime.fromtimestamp(float(text), tz=timezone.utc).date()
+
+def read_activity(path):
+    """Seat dicts from a CSV or JSONL activity export"""
+    with open(path, newline='', encoding='utf-8') as handle:
+        if str(path).lower().endswith('.csv'):
+            return list(csv.DictReader(handle))
+        return [json.loads(line) for line in handle if line.strip()]
+
+def _normalise(seat, index, dev_tools):
+    """(user, product, tier, last_active, active_days) or None for tools missing from the price index"""
+    tool, tier = seat['tool'], seat.get('tier') or ''
+    if tool in dev_tools:
+        product = tool
+        if not tier:
+            tier = 'business' if 'business' in dev_tools[tool] else 'pro'
+    else:
+        product, _, plan_tier = tool.partition('_')
+        tier = tier or plan_tier
+    if (product, tier) not in index['prices']:
+        return None
+    active_days = seat.get('active_days')
+    return (seat['user'], product, tier, _as_date(seat.get('last_active')),
+            None if active_days in (None, '') else int(active_days))
+
+def optimize_seats(seats, as_of=None, idle_days=DEFAULT_IDLE_DAYS, light_usage_days=DEFAULT_LIGHT_USAGE_DAYS,
+                   tables=None):
+    """Idle, duplicate and over-tiered seats across DEV_TOOLS and TEAM_SUBS
+
+    Each seat is settled once, in this order:
+    1. idle: zero active_days, or a last_active more than idle_days before
+       as_of (default: the latest activity in the export). Seats with
+       neither field filled are never called idle;
+    2. duplicate: a user's other seats in the same category (coding or
+       chat assistants); the most used seat is kept;
+    3. tier: kept seats used on fewer than light_usage_days days move to
+       their product's cheapest managed tier.
+    Returns {'recommendations', 'seats', 'skipped', 'as_of', 'assignments'}; the
+    recommendations are one per tool and finding, priced on the affected
+    seats only, in the analyze_dev_tools format.
+    """
+    tables = tables or active_pricing()
+    index = build_seat_index(tables['dev_tools'], tables['team_subs'])
+    prices, categories, cheapest = index['prices'], index['categories'], index['cheapest_tier']
+
+    by_user, skipped, latest = {}, 0, None
+    for seat in seats:
+        row = _normalise(seat, index, tables['dev_tools'])
+        if row is None:
+            skipped += 1
+            continue
+        by_user.setdefault(row[0], []).append(row)
+        if row[3] is not None and (latest is None or row[3] > latest):
+            latest = row[3]
+    as_of = _as_date(as_of) or latest or date.today()
+
+    # (kind, product, tier, target tier) -> [users, current cost, optimised cost]
+    findings = {}
+    assignments = {}
+
+    def record(kind, product, tier, user, current, optimised, target=None):
+        entry = findings.setdefault((kind, product, tier, target), [[], 0, 0])
+        entry[0].append(user)
+        entry[1] += current
+        entry[2] += optimised
+
+    for user, rows in by_user.items():
+        kept_by_category = {}
+        for row in rows:
+            _user, product, tier, last_active, active_days = row
+            # active_days covers the export period, so it stands in for a missing last_active
+            if active_days == 0 or (last_active is not None and (as_of - last_active).days > idle_days):
+                record('idle_seats', product, tier, user, prices[(product, tier)], 0)
+                continue
+            category = categories[product]
+            kept = kept_by_category.get(category)
+            if kept is None:
+                kept_by_category[category] = row
+                continue
+            # Keep the more used seat; on a tie keep the one active most recently
+            if ((active_days or 0), last_active or date.min) > ((kept[4] or 0), kept[3] or date.min):
+                kept_by_category[category], row = row, kept
+            record('duplicate_seats', row[1], row[2], user, prices[(row[1], row[2])], 0)
+        for _user, product, tier, _last_active, active_days in kept_by_category.values():
+            target = cheapest.get(product, tier)
+            if (active_days is not None and active_days < light_usage_days
+                    and prices[(product, target)] < prices[(product, tier)]):
+                record('tier_downgrade', product, tier, user, prices[(product, tier)], prices[(product, target)],
+                       target)
+                assignments.setdefault(user, []).append((product, target))
+            else:
+                assignments.setdefault(user, []).append((product, tier))
+
+    recommendations = []
+    for (kind, product, tier, target), (users, current, optimised) in findings.items():
+        if current <= optimised:
+            continue
+        args = (product, len(users), tier, tuple(users)) if target is None else \
+            (product, len(users), tier, tuple(users), target)
+        recommendations.append(Recommendation(kind, current, optimised, current - optimised, *args))
+    recommendations.sort(key=lambda r: r.monthly_savings, reverse=True)
+    return {
+        'recommendations': recommendations,
+        'seats': sum(len(rows) for rows in by_user.values()),
+        'skipped': skipped,
+        'as_of': as_of.isoformat(),
+        'assignments': assignments,
+    }
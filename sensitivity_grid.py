@@ -0,0 +1,150 @@
+# sensitivity_grid.py
+"""Precomputed what-if grid of model costs and cheapest alternatives
+
+Per-call cost is evaluated for every model on a log-spaced grid of input
+and output token counts. Monthly cost is per-call cost times calls, so the
+calls axis factors out exactly and is applied at lookup time instead of
+multiplying the stored array by the number of call points. The grid holds:
+
+    per_call   float32 (models, inputs, outputs)  cost of one call
+    ranking    int16   (inputs, outputs, 2)       cheapest and second cheapest
+                                                  model whose context fits
+
+Lookups compute their grid cell arithmetically from the log spacing, so
+they are O(1) whatever the grid size.
+"""
+import math
+
+import numpy as np
+
+from calculator import active_pricing
+
+DEFAULT_CALLS = (1_000, 100_000_000)
+DEFAULT_INPUT_TOKENS = (10, 200_000)
+DEFAULT_OUTPUT_TOKENS = (10, 32_000)
+DEFAULT_POINTS = 48
+
+def log_axis(lo, hi, points):
+    return np.geomspace(lo, hi, points)
+
+class SensitivityGrid:
+    """Cost and cheapest-alternative grid for one version of the pricing tables"""
+
+    def __init__(self, tables=None, input_range=DEFAULT_INPUT_TOKENS, output_range=DEFAULT_OUTPUT_TOKENS,
+                 calls_range=DEFAULT_CALLS, points=DEFAULT_POINTS):
+        tables = tables or active_pricing()
+        matrix = tables['price_matrix']
+        self.version = tables['version']
+        self.serial = tables.serial
+        self.model_keys = matrix['model_keys']
+        self.index = matrix['index']
+        self.contexts = matrix['contexts']
+        self.input_axis = log_axis(*input_range, points)
+        self.output_axis = log_axis(*output_range, points)
+        self.calls_axis = log_axis(*calls_range, points)
+
+        prices = matrix['prices'] / 1_000_000
+        inputs = self.input_axis[None, :, None]
+        outputs = self.output_axis[None, None, :]
+        per_call = prices[0][:, None, None] * inputs + prices[1][:, None, None] * outputs
+        self.per_call = per_call.astype(np.float32)
+
+        # Models whose context can't hold a call never rank
+        fits = matrix['contexts'][:, None, None] >= inputs + outputs
+        ranked = np.where(fits, per_call, np.inf)
+        order = np.argsort(ranked, axis=0, kind='stable')[:2]
+        self.ranking = np.moveaxis(order, 0, -1).astype(np.int16)
+        no_fit = ~np.isfinite(np.take_along_axis(ranked, order, axis=0))
+        self.ranking[np.moveaxis(no_fit, 0, -1)] = -1
+
+    def _position(self, axis, value):
+        """Fractional index of value on a log-spaced axis, clamped to its ends"""
+        step = math.log(axis[1] / axis[0])
+        pos = math.log(max(value, axis[0]) / axis[0]) / step if value > 0 else 0.0
+        return min(pos, len(axis) - 1)
+
+    def _cell(self, input_tokens, output_tokens):
+        """Lower corner and interpolation weights of the cell holding a point"""
+        corners, weights = [], []
+        for axis, value in ((self.input_axis, input_tokens), (self.output_axis, output_tokens)):
+            pos = self._position(axis, value)
+            lo = min(int(pos), len(axis) - 2)
+            # Per-call cost is linear in tokens, so weights are linear in tokens too
+            span = axis[lo + 1] - axis[lo]
+            corners.append(lo)
+            weights.append(min(max((value - axis[lo]) / span, 0.0), 1.0))
+        return corners, weights
+
+    def _model(self, model):
+        return model if isinstance(model, (int, np.integer)) else self.index[tuple(model)]
+
+    def cost(self, model, monthly_calls, avg_input_tokens, avg_output_tokens):
+        """Interpolated monthly cost of a (provider, model) key or model index; tokens are clamped to the grid"""
+        (i, j), (wi, wo) = self._cell(avg_input_tokens, avg_output_tokens)
+        block = self.per_call[self._model(model), i:i + 2, j:j + 2]
+        per_call = ((1 - wi) * ((1 - wo) * block[0, 0] + wo * block[0, 1])
+                    + wi * ((1 - wo) * block[1, 0] + wo * block[1, 1]))
+        return float(per_call) * monthly_calls
+
+    def best_alternative(self, model, monthly_calls, avg_input_tokens, avg_output_tokens):
+        """Cheapest other model that fits the point, or None
+
+        The cheapest and runner-up models of the four surrounding grid nodes
+        are costed exactly at the point, so the answer only differs from a
+        full catalog scan where a fifth model wins strictly inside a cell.
+        """
+        m = self._model(model)
+        (i, j), _weights = self._cell(avg_input_tokens, avg_output_tokens)
+        needed = avg_input_tokens + avg_output_tokens
+        best = None
+        for candidate in np.unique(self.ranking[i:i + 2, j:j + 2]).tolist():
+            if candidate < 0 or candidate == m or self.contexts[candidate] < needed:
+                continue
+            cost = self.cost(candidate, monthly_calls, avg_input_tokens, avg_output_tokens)
+            if best is None or cost < best[0]:
+                best = (cost, candidate)
+        if best is None:
+            return None
+        current = self.cost(m, monthly_calls, avg_input_tokens, avg_output_tokens)
+        cost, alt = best
+        provider, name = self.model_keys[alt]
+        return {'provider': provider, 'model': name, 'cost': cost, 'savings': current - cost,
+                'savings_pct': (current - cost) / current * 100 if current > 0 else 0.0}
+
+    def cheapest_map(self):
+        """(inputs, outputs) index of the cheapest fitting model at every node; -1 where none fits"""
+        return self.ranking[..., 0]
+
+    def savings_map(self, model):
+        """(inputs, outputs) share of a model's cost saved by the cheapest other fitting model"""
+        m = self._model(model)
+        alt = np.where(self.ranking[..., 0] == m, self.ranking[..., 1], self.ranking[..., 0])
+        own = self.per_call[m]
+        alt_cost = np.take_along_axis(self.per_call, np.maximum(alt, 0)[None], axis=0)[0]
+        saved = np.where(alt >= 0, (own - alt_cost) / np.where(own > 0, own, 1), 0.0)
+        return np.clip(saved, 0.0, None)
+
+    def cost_surface(self, model, avg_output_tokens):
+        """(calls, inputs) monthly cost of a model at a fixed output token count"""
+        m = self._model(model)
+        j = self._position(self.output_axis, avg_output_tokens)
+        lo = min(int(j), len(self.output_axis) - 2)
+        w = min(max((avg_output_tokens - self.output_axis[lo]) / (self.output_axis[lo + 1] - self.output_axis[lo]),
+                    0.0), 1.0)
+        per_call = (1 - w) * self.per_call[m, :, lo] + w * self.per_call[m, :, lo + 1]
+        return self.calls_axis[:, None] * per_call[None, :]
+
+    @property
+    def nbytes(self):
+        return self.per_call.nbytes + self.ranking.nbytes
+
+_GRID = None
+
+def sensitivity_grid(tables=None):
+    """Grid for the active pricing tables, rebuilt whenever different tables are installed"""
+    global _GRID
+    tables = tables or active_pricing()
+    grid = _GRID
+    if grid is None or grid.serial != tables.serial:
+        grid = _GRID = SensitivityGrid(tables)
+    return grid
@@ -0,0 +1,219 @@
+# spend_tracker.py
+"""Incremental real-time spend tracking over rolling windows
+
+Each tracked scope (everything, a provider, a model, a team, a
+provider/model/team combination) keeps one fixed-size ring buffer per
+window. An event touches one bucket per ring, so updates are O(1) and
+memory depends only on the number of scopes, never on stream length.
+"""
+from calculator import active_pricing, optimize_api_usage
+
+# name -> (bucket count, bucket width in seconds)
+WINDOWS = {
+    'minute': (60, 1),
+    'hour': (60, 60),
+    'day': (96, 900),
+    'month': (30, 86400),
+}
+_METRICS = 4  # cost, calls, input tokens, output tokens
+
+class RollingWindow:
+    """Ring buffer of per-bucket totals with a running sum over the window"""
+
+    __slots__ = ('n', 'width', 'head', 'buckets', 'totals')
+
+    def __init__(self, n, width):
+        self.n = n
+        self.width = width
+        self.head = None
+        self.buckets = [[0.0] * _METRICS for _ in range(n)]
+        self.totals = [0.0] * _METRICS
+
+    def advance(self, now):
+        """Expire buckets that fell out of the window by time now"""
+        epoch = int(now // self.width)
+        head = self.head
+        if head is None:
+            self.head = epoch
+            return epoch
+        if epoch <= head:
+            return epoch
+        if epoch - head >= self.n:
+            # The whole window expired; reset exactly instead of subtracting
+            for bucket in self.buckets:
+                bucket[:] = [0.0] * _METRICS
+            self.totals = [0.0] * _METRICS
+        else:
+            totals = self.totals
+            for e in range(head + 1, epoch + 1):
+                bucket = self.buckets[e % self.n]
+                for k in range(_METRICS):
+                    totals[k] -= bucket[k]
+                    bucket[k] = 0.0
+        self.head = epoch
+        return epoch
+
+    def add(self, now, values):
+        """Add metric values at time now; returns False for events older than the window"""
+        epoch = int(now // self.width)
+        if epoch != self.head:
+            self.advance(now)
+            if epoch <= self.head - self.n:
+                return False
+        bucket = self.buckets[epoch % self.n]
+        totals = self.totals
+        cost, calls, input_tokens, output_tokens = values
+        bucket[0] += cost
+        bucket[1] += calls
+        bucket[2] += input_tokens
+        bucket[3] += output_tokens
+        totals[0] += cost
+        totals[1] += calls
+        totals[2] += input_tokens
+        totals[3] += output_tokens
+        return True
+
+    def snapshot(self, now=None):
+        if now is not None:
+            self.advance(now)
+        cost, calls, input_tokens, output_tokens = self.totals
+        return {'cost': cost, 'calls': calls, 'input_tokens': input_tokens, 'output_tokens': output_tokens}
+
+class SpendTracker:
+    """Rolling spend per provider, model and team with budget alerts and lazy re-optimisation
+
+    Events are dicts (or objects with the same keys): timestamp, provider,
+    model, team, input_tokens, output_tokens and optionally cost; missing
+    costs are priced with the active pricing tables.
+    """
+
+    def __init__(self, use_case=None, change_threshold=0.10, on_recommendations=None, windows=WINDOWS):
+        self.windows = dict(windows)
+        self.use_case = use_case
+        self.change_threshold = change_threshold
+        self.on_recommendations = on_recommendations
+        self.scopes = {}
+        self.budgets = []
+        self.recommendations = {}
+        self._analysed = {}
+        self.events = 0
+        self.late_events = 0
+        self.now = None
+
+    def _rings(self, scope):
+        rings = self.scopes.get(scope)
+        if rings is None:
+            rings = self.scopes[scope] = {name: RollingWindow(n, width) for name, (n, width) in self.windows.items()}
+        return rings
+
+    def add_budget(self, window, limit, callback, provider=None, model=None, team=None):
+        """Call callback(alert) when spend in the scope crosses limit within window
+
+        The alert fires once per crossing and re-arms when spend drops back
+        below the limit.
+        """
+        if window not in self.windows:
+            raise ValueError(f'Unknown window {window!r}; expected one of {sorted(self.windows)}')
+        scope = self._scope_for(provider, model, team)
+        self.budgets.append({'scope': scope, 'window': window, 'limit': limit, 'callback': callback, 'alerted': False})
+        return self
+
+    @staticmethod
+    def _scope_for(provider=None, model=None, team=None):
+        if model is not None:
+            if provider is None:
+                raise ValueError('A model scope needs its provider')
+            return ('model', provider, model) if team is None else ('usage', provider, model, team)
+        if provider is not None:
+            return ('provider', provider)
+        if team is not None:
+            return ('team', team)
+        return ('all',)
+
+    def add_event(self, event):
+        """Fold one priced call event into every rolling window"""
+        get = event.get if isinstance(event, dict) else lambda k, d=None: getattr(event, k, d)
+        now = float(get('timestamp'))
+        provider, model, team = get('provider'), get('model'), get('team', 'default')
+        input_tokens, output_tokens = get('input_tokens', 0) or 0, get('output_tokens', 0) or 0
+        calls = get('calls', 1) or 1
+        cost = get('cost')
+        if cost is None:
+            catalog = active_pricing()['catalog']
+            i = catalog.index.get((provider, model))
+            cost = catalog.cost(i, calls * input_tokens / 1_000_000, calls * output_tokens / 1_000_000) if i is not None else 0.0
+        values = (cost, calls, calls * input_tokens, calls * output_tokens)
+        self.now = now if self.now is None else max(self.now, now)
+        accepted = True
+        for scope in (('all',), ('provider', provider), ('model', provider, model), ('team', team),
+                      ('usage', provider, model, team)):
+            for ring in self._rings(scope).values():
+                accepted = ring.add(now, values) and accepted
+        self.events += 1
+        if not accepted:
+            self.late_events += 1
+        self._check_budgets(provider, model, team)
+        self._maybe_reoptimise(provider, model)
+        return accepted
+
+    def add_events(self, events):
+        """Fold a micro-batch of events"""
+        for event in events:
+            self.add_event(event)
+        return self
+
+    def _check_budgets(self, provider, model, team):
+        touched = {('all',), ('provider', provider), ('model', provider, model), ('team', team),
+                   ('usage', provider, model, team)}
+        for budget in self.budgets:
+            if budget['scope'] not in touched:
+                continue
+            spend = self.scopes[budget['scope']][budget['window']].totals[0]
+            if spend >= budget['limit'] and not budget['alerted']:
+                budget['alerted'] = True
+                budget['callback']({
+                    'scope': budget['scope'],
+                    'window': budget['window'],
+                    'limit': budget['limit'],
+                    'spend': spend,
+                    'timestamp': self.now,
+                })
+            elif spend < budget['limit']:
+                budget['alerted'] = False
+
+    def _maybe_reoptimise(self, provider, model):
+        """Re-run optimize_api_usage only when the model's monthly workload moved materially"""
+        if (provider, model) not in active_pricing()['catalog'].index:
+            return
+        _cost, calls, input_tokens, output_tokens = self.scopes[('model', provider, model)]['month'].totals
+        if calls <= 0:
+            return
+        workload = (calls, input_tokens / calls, output_tokens / calls)
+        previous = self._analysed.get((provider, model))
+        if previous is not None and all(
+            abs(now - before) <= self.change_threshold * max(abs(before), 1e-9)
+            for now, before in zip(workload, previous)
+        ):
+            return
+        self._analysed[(provider, model)] = workload
+        recommendations = optimize_api_usage(provider, model, workload[0], workload[1], workload[2], self.use_case)
+        self.recommendations[(provider, model)] = recommendations
+        if self.on_recommendations is not None:
+            self.on_recommendations(provider, model, recommendations)
+
+    def totals(self, window, provider=None, model=None, team=None, now=None):
+        """Rolling totals for a scope and window, expired up to now (default: latest event time)"""
+        scope = self._scope_for(provider, model, team)
+        rings = self.scopes.get(scope)
+        if rings is None:
+            return RollingWindow(1, 1).snapshot()
+        return rings[window].snapshot(now if now is not None else self.now)
+
+    def breakdown(self, window, by='provider', now=None):
+        """Rolling totals for every provider, model or team"""
+        kind = {'provider': 'provider', 'model': 'model', 'team': 'team'}[by]
+        now = now if now is not None else self.now
+        return {
+            scope[1:] if len(scope) > 2 else scope[1]: rings[window].snapshot(now)
+            for scope, rings in self.scopes.items() if scope[0] == kind
+        }
@@ -0,0 +1,52 @@
+# test_batch_pricing.py
+"""The vectorised and catalog pricing paths must match the scalar path exactly"""
+import numpy as np
+import pytest
+
+from calculator import active_pricing, calculate_api_cost, calculate_api_cost_batch, find_cheapest_alternative
+
+def random_workloads(n, seed):
+    rng = np.random.default_rng(seed)
+    return (rng.integers(0, 50_000_000, n), rng.lognormal(6.5, 1.5, n).round(), rng.lognormal(5.5, 1.2, n).round())
+
+def scalar_alternatives(provider, model, monthly_calls, avg_input_tokens, avg_output_tokens):
+    """The original full-scan find_cheapest_alternative"""
+    current_cost = calculate_api_cost(provider, model, monthly_calls, avg_input_tokens, avg_output_tokens)
+    alternatives = []
+    for alt_provider, models in active_pricing()['api_pricing'].items():
+        for alt_model in models:
+            alt_cost = calculate_api_cost(alt_provider, alt_model, monthly_calls, avg_input_tokens, avg_output_tokens)
+            if alt_cost < current_cost:
+                alternatives.append({
+                    'provider': alt_provider,
+                    'model': alt_model,
+                    'cost': alt_cost,
+                    'savings': current_cost - alt_cost,
+                    'savings_pct': ((current_cost - alt_cost) / current_cost) * 100,
+                })
+    alternatives.sort(key=lambda x: x['savings'], reverse=True)
+    return alternatives[:3]
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_batch_matches_scalar_bit_for_bit(seed):
+    calls, input_tokens, output_tokens = random_workloads(500, seed)
+    costs = calculate_api_cost_batch(calls, input_tokens, output_tokens)
+    model_keys = active_pricing()['price_matrix']['model_keys']
+    assert costs.shape == (500, len(model_keys))
+    for w in range(len(calls)):
+        for m, (provider, model) in enumerate(model_keys):
+            expected = calculate_api_cost(provider, model, int(calls[w]), float(input_tokens[w]),
+                                          float(output_tokens[w]))
+            assert costs[w, m] == expected
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_cheapest_alternative_matches_full_scan(seed):
+    calls, input_tokens, output_tokens = random_workloads(1_000, seed)
+    model_keys = active_pricing()['price_matrix']['model_keys']
+    for w in range(len(calls)):
+        provider, model = model_keys[w % len(model_keys)]
+        args = (provider, model, int(calls[w]), float(input_tokens[w]), float(output_tokens[w]))
+        assert find_cheapest_alternative(*args) == scalar_alternatives(*args)
+
+def test_empty_batch():
+    assert calculate_api_cost_batch([], [], []).shape == (0, len(active_pricing()['price_matrix']['model_keys']))
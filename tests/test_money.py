@@ -0,0 +1,72 @@
+# test_money.py
+"""Exact money mode must agree with rational arithmetic to the cent"""
+import random
+from decimal import Decimal
+from fractions import Fraction
+from math import floor
+
+import numpy as np
+import pytest
+
+from calculator import active_pricing, calculate_api_cost_batch_exact, calculate_api_cost_exact
+from money import price_to_nanocents, to_cents, token_costs
+
+def reference_cents(provider, model, monthly_calls, avg_input_tokens, avg_output_tokens):
+    """Whole cents from Fractions: tokens rounded half-even, the total rounded half-up once"""
+    pricing = active_pricing()['api_pricing'][provider][model]
+    total = Fraction(0)
+    for avg_tokens, price in ((avg_input_tokens, pricing['input']), (avg_output_tokens, pricing['output'])):
+        tokens = round(Fraction(str(monthly_calls)) * Fraction(str(avg_tokens)))
+        # $ per 1M tokens -> cents per token
+        total += tokens * Fraction(str(price)) * 100 / 1_000_000
+    return floor(total + Fraction(1, 2))
+
+def random_workloads(n, seed):
+    rng = random.Random(seed)
+    model_keys = active_pricing()['price_matrix']['model_keys']
+    for _ in range(n):
+        provider, model = rng.choice(model_keys)
+        yield (provider, model, rng.randint(1, 100_000_000), round(rng.uniform(1, 20_000), rng.randint(0, 3)),
+               round(rng.uniform(1, 4_000), rng.randint(0, 3)))
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_scalar_exact_matches_fraction_reference(seed):
+    for workload in random_workloads(1_000, seed):
+        assert calculate_api_cost_exact(*workload) == Decimal(reference_cents(*workload)) / 100
+
+def test_batch_exact_matches_scalar():
+    rng = np.random.default_rng(0)
+    input_tokens = rng.integers(0, 10 ** 12, 300)
+    output_tokens = rng.integers(0, 10 ** 11, 300)
+    exact_prices = active_pricing()['exact_prices']
+    costs = calculate_api_cost_batch_exact(input_tokens, output_tokens)
+    assert costs.dtype == np.int64
+    cents = to_cents(costs)
+    for m, (provider, model) in enumerate(exact_prices['model_keys']):
+        pricing = active_pricing()['api_pricing'][provider][model]
+        for w in range(0, 300, 7):
+            nanocents = (int(input_tokens[w]) * price_to_nanocents(pricing['input'])
+                         + int(output_tokens[w]) * price_to_nanocents(pricing['output']))
+            assert costs[w, m] == nanocents
+            assert cents[w, m] == to_cents(nanocents)
+
+def test_overflowing_products_fall_back_to_python_ints():
+    input_tokens = np.array([[2 ** 62], [3]], dtype=np.int64)
+    output_tokens = np.array([[1], [2 ** 61]], dtype=np.int64)
+    prices = np.array([7_500_000, 100_000], dtype=np.int64)
+    costs = token_costs(input_tokens, output_tokens, prices, prices)
+    assert costs.dtype == object
+    assert costs.tolist() == [[2 ** 62 * 7_500_000 + 7_500_000, 2 ** 62 * 100_000 + 100_000],
+                              [3 * 7_500_000 + 2 ** 61 * 7_500_000, 3 * 100_000 + 2 ** 61 * 100_000]]
+
+def test_prices_convert_exactly():
+    assert price_to_nanocents(1.3125) == 131_250
+    assert price_to_nanocents(0.105) == 10_500
+    assert price_to_nanocents(0.028) == 2_800
+    with pytest.raises(ValueError):
+        price_to_nanocents(0.000001)
+
+def test_cent_rounding_is_half_up():
+    assert to_cents(1_500_000_000) == 2
+    assert to_cents(1_499_999_999) == 1
+    assert to_cents(np.array([500_000_000, 499_999_999, 2_500_000_000])).tolist() == [1, 0, 3]
@@ -0,0 +1,70 @@
+# test_parallel_logs.py
+"""Parallel log ingestion must reproduce the single-process aggregate exactly"""
+import csv
+import json
+import random
+
+import pytest
+
+from calculator import active_pricing
+from records import to_json
+from usage_logs import analyze_usage, ingest_log, ingest_log_parallel
+
+USE_CASES = ('customer_support', 'code_generation', 'résumé screening', 'données', None)
+
+def log_rows(n, seed):
+    rng = random.Random(seed)
+    model_keys = active_pricing()['price_matrix']['model_keys'] + [('openai', 'not-a-model')]
+    for _ in range(n):
+        provider, model = rng.choice(model_keys)
+        day = f'2025-{rng.randint(9, 11):02d}-{rng.randint(1, 28):02d}'
+        yield {
+            'provider': provider,
+            'model': model,
+            'input_tokens': rng.randint(1, 20_000),
+            'output_tokens': rng.randint(1, 4_000),
+            'timestamp': rng.choice([f'{day}T{rng.randint(0, 23):02d}:15:00Z', f'{day}T23:30:00-05:00',
+                                     1759000000 + rng.randint(0, 5_000_000)]),
+            'use_case': rng.choice(USE_CASES),
+        }
+
+def write_jsonl(path, n, seed):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as handle:
+        for row in log_rows(n, seed):
+            handle.write(json.dumps(row, ensure_ascii=False) + '\n')
+            if rng.random() < 0.01:
+                handle.write(rng.choice(['{"provider": "openai"\n', 'not json\n', '\n']))
+
+def write_csv(path, n, seed):
+    with open(path, 'w', encoding='utf-8', newline='') as handle:
+        writer = csv.DictWriter(handle, fieldnames=['provider', 'model', 'input_tokens', 'output_tokens',
+                                                    'timestamp', 'use_case'])
+        writer.writeheader()
+        for k, row in enumerate(log_rows(n, seed)):
+            if k % 97 == 0:
+                row['input_tokens'] = 'n/a'
+            writer.writerow(row)
+
+def assert_same(single, parallel):
+    assert list(parallel.groups.items()) == list(single.groups.items())
+    assert parallel.records == single.records
+    assert parallel.parse_errors == single.parse_errors
+    assert parallel.rows() == single.rows()
+    assert (json.dumps(analyze_usage(parallel), default=to_json)
+            == json.dumps(analyze_usage(single), default=to_json))
+
+@pytest.mark.parametrize('fmt, write', [('jsonl', write_jsonl), ('csv', write_csv)])
+@pytest.mark.parametrize('workers, ranges_per_worker', [(2, 1), (3, 7)])
+def test_parallel_matches_single_process(tmp_path, fmt, write, workers, ranges_per_worker):
+    path = tmp_path / f'usage.{fmt}'
+    write(path, 3_000, seed=workers)
+    single = ingest_log(str(path), fmt, chunk_size=257)
+    parallel = ingest_log_parallel(str(path), workers, fmt, chunk_size=257, ranges_per_worker=ranges_per_worker)
+    assert single.records > 0 and single.parse_errors > 0
+    assert_same(single, parallel)
+
+def test_more_ranges_than_lines(tmp_path):
+    path = tmp_path / 'usage.jsonl'
+    write_jsonl(path, 3, seed=0)
+    assert_same(ingest_log(str(path)), ingest_log_parallel(str(path), workers=2, ranges_per_worker=50))
@@ -0,0 +1,24 @@
+# test_portfolio.py
+"""Portfolio CSVs report bad rows as errors instead of raising"""
+from portfolio import read_portfolio_csv
+
+HEADER = 'service,provider,model,monthly_calls,avg_input_tokens,avg_output_tokens,use_case\n'
+
+def test_extra_cells_are_reported():
+    rows, errors = read_portfolio_csv((HEADER + 'a,openai,gpt-4o,100,10,10,,surplus\n'
+                                       'b,openai,gpt-4o,100,10,10,\n').encode())
+    assert [row['service'] for row in rows] == ['b']
+    assert errors == [{'line': 2, 'error': '1 more cell(s) than the header'}]
+
+def test_non_finite_and_negative_numbers_are_reported():
+    rows, errors = read_portfolio_csv((HEADER + 'a,openai,gpt-4o,nan,10,10,\n'
+                                       'b,openai,gpt-4o,100,-1,10,\n'
+                                       'c,openai,gpt-4o,100,10,inf,\n').encode())
+    assert rows == []
+    assert [error['line'] for error in errors] == [2, 3, 4]
+
+def test_short_rows_default_to_zero():
+    rows, errors = read_portfolio_csv((HEADER + 'a,openai,gpt-4o,100\n').encode())
+    assert errors == []
+    assert rows[0]['avg_input_tokens'] == 0.0
+    assert rows[0]['use_case'] is None
@@ -0,0 +1,74 @@
+# test_price_importer.py
+"""Price sheet parsers: layouts, model names and malformed sheets"""
+import pytest
+
+from price_importer import (_parse_sheet, import_price_sheets, normalise_model, parse_csv, parse_html,
+                            parse_json)
+
+@pytest.mark.parametrize('name, provider, expected', [
+    ('Claude Opus 4.1', 'anthropic', 'claude-opus-4.1'),
+    ('claude-opus-4-1-20250805', 'anthropic', 'claude-opus-4.1'),
+    ('claude-3-5-haiku-latest', 'anthropic', 'claude-haiku-3.5'),
+    ('gemini-2.0-flash-001', 'google', 'gemini-2.0-flash'),
+    ('mistral-large-2411', 'mistral', 'mistral-large'),
+    ('command-a-03-2025', 'cohere', 'command-a'),
+    ('GPT-4o (2024-08-06)', 'openai', 'gpt-4o'),
+])
+def test_normalise_model(name, provider, expected):
+    assert normalise_model(name, provider) == expected
+
+def test_csv_per_thousand_prices_scale_to_per_million():
+    models = parse_csv(b'Model,Input per 1K,Output per 1K,Context window\n'
+                       b'gpt-4o,$0.0025,$0.01,128K\n', 'openai')
+    assert models == {'gpt-4o': {'input': 2.5, 'output': 10.0, 'context': 128000}}
+
+def test_html_reads_pricing_table():
+    page = (b'<table><tr><th>Model</th><th>Input</th><th>Output</th></tr>'
+            b'<tr><td>Claude Sonnet 4</td><td>$3 / MTok</td><td>$15 / MTok</td></tr></table>')
+    assert parse_html(page, 'anthropic') == {'claude-sonnet-4': {'input': 3.0, 'output': 15.0}}
+
+@pytest.mark.parametrize('sheet', [
+    b'[{"model": "gpt-4o", "input": 2.5, "output": 10}]',
+    b'{"models": [{"model": "gpt-4o", "input": 2.5, "output": 10}]}',
+    b'{"gpt-4o": {"input": 2.5, "output": 10}}',
+])
+def test_json_layouts(sheet):
+    assert parse_json(sheet, 'openai') == {'gpt-4o': {'input': 2.5, 'output': 10.0}}
+
+@pytest.mark.parametrize('sheet', [b'[1, 2]', b'{"models": {"x": 5}}', b'"prices"', b'{"models": [["x", 1, 2]]}'])
+def test_json_bad_shapes_raise_value_error(sheet):
+    with pytest.raises(ValueError):
+        parse_json(sheet)
+    models, error = _parse_sheet(parse_json, sheet)
+    assert models is None and error
+
+@pytest.mark.parametrize('sheet', [
+    b'[{"model": "a", "input": NaN, "output": 1}]',
+    b'[{"model": "a", "input": 1e400, "output": 1}]',
+    b'[{"model": "a", "input": -1, "output": 1}]',
+])
+def test_json_non_finite_or_negative_prices_are_rejected(sheet):
+    with pytest.raises(ValueError):
+        parse_json(sheet)
+
+def test_csv_negative_price_is_rejected():
+    with pytest.raises(ValueError):
+        parse_csv(b'model,input,output\na,-2.50,10\n')
+
+def test_boolean_price_cell_is_not_a_price():
+    assert parse_json(b'[{"model": "a", "input": true, "output": 1}, {"model": "b", "input": 1, "output": 2}]') == {
+        'b': {'input': 1.0, 'output': 2.0}}
+
+def test_bad_sheet_does_not_abort_import(tmp_path):
+    sheets = tmp_path / 'sheets'
+    sheets.mkdir()
+    (sheets / 'openai.json').write_text('{"gpt-4o": {"input": 2.0, "output": 8.0}}')
+    (sheets / 'anthropic.json').write_text('[1, 2]')
+    (sheets / 'mistral.json').write_text('[{"model": "mistral-large", "input": -1, "output": 6}]')
+    result = import_price_sheets([str(sheets)], str(tmp_path / 'pricing.json'), effective_date='2025-11-01',
+                                 workers=1, dry_run=True)
+    errors = {row['provider']: row['error'] for row in result['sheets']}
+    assert errors['openai'] is None
+    assert errors['anthropic'] and errors['mistral']
+    assert {(change['model'], change['field']) for change in result['changes']} == {
+        ('gpt-4o', 'input'), ('gpt-4o', 'output')}
@@ -0,0 +1,38 @@
+# test_pricing_catalog.py
+"""Catalog top-k queries must match a full scan, with and without a context bound"""
+import random
+
+import pytest
+
+from benchmark import make_catalog
+from pricing_catalog import PricingCatalog
+
+@pytest.fixture(scope='module')
+def catalog():
+    api_pricing = make_catalog(2_000, seed=3)
+    rng = random.Random(3)
+    # A handful of very long contexts makes the largest bounds selective
+    for models in api_pricing.values():
+        for entry in models.values():
+            if rng.random() < 0.01:
+                entry['context'] = 2_000_000
+    return PricingCatalog(api_pricing)
+
+def full_scan(catalog, input_volume, output_volume, k, min_context, tier=None):
+    return sorted((catalog.cost(i, input_volume, output_volume), i) for i in range(len(catalog.model_keys))
+                  if catalog.contexts[i] >= min_context and tier in (None, catalog.tiers[i]))[:k]
+
+@pytest.mark.parametrize('min_context', [0, 64_000, 200_000, 1_000_000, 2_000_000, 5_000_000])
+@pytest.mark.parametrize('k', [1, 4, 50])
+def test_top_k_matches_full_scan(catalog, min_context, k):
+    rng = random.Random(k)
+    for _ in range(20):
+        input_volume, output_volume = rng.uniform(0, 100), rng.uniform(0, 100)
+        assert catalog.top_k_cheapest(input_volume, output_volume, k, min_context=min_context) == \
+            full_scan(catalog, input_volume, output_volume, k, min_context)
+
+@pytest.mark.parametrize('min_context', [0, 1_000_000, 2_000_000])
+def test_tier_view_with_context_bound(catalog, min_context):
+    for tier in sorted(catalog.by_tier):
+        assert catalog.top_k_cheapest(3.0, 1.0, 3, tier=tier, min_context=min_context) == \
+            full_scan(catalog, 3.0, 1.0, 3, min_context, tier)
@@ -0,0 +1,43 @@
+# test_pricing_service.py
+"""Malformed requests get an HTTP answer, never a dropped connection"""
+import json
+
+import pytest
+
+import pricing_service
+from pricing_service import dispatch
+
+HUGE = '9' * 400
+
+@pytest.mark.parametrize('path, body', [
+    ('/cost', f'{{"provider":"openai","model":"gpt-4o","input_tokens":{HUGE},"output_tokens":10}}'),
+    ('/cost/batch', f'[{{"provider":"openai","model":"gpt-4o","input_tokens":{HUGE},"output_tokens":10}}]'),
+    ('/recommendations', f'{{"provider":"openai","model":"gpt-4o","monthly_calls":{HUGE},'
+                         f'"avg_input_tokens":10,"avg_output_tokens":10}}'),
+])
+def test_huge_integers_are_rejected(path, body):
+    status, result = dispatch('POST', path, body.encode())
+    assert status == 400
+    assert 'finite' in result['error']
+
+def test_batch_rejects_boolean_calls():
+    body = json.dumps([{'provider': 'openai', 'model': 'gpt-4o', 'calls': True, 'input_tokens': 10}])
+    status, result = dispatch('POST', '/cost/batch', body.encode())
+    assert status == 400
+    assert 'calls' in result['error']
+
+def test_batch_prices_valid_requests():
+    body = json.dumps({'requests': [{'provider': 'openai', 'model': 'gpt-4o', 'input_tokens': 1000,
+                                     'output_tokens': 1000, 'calls': 1000}]})
+    status, result = dispatch('POST', '/cost/batch', body.encode())
+    assert status == 200
+    assert result['costs'] == [12.5]
+
+def test_unexpected_errors_become_500(monkeypatch):
+    def broken(payload):
+        raise RuntimeError('boom')
+
+    monkeypatch.setitem(pricing_service.ROUTES, '/cost', broken)
+    status, result = dispatch('POST', '/cost', b'{}')
+    assert status == 500
+    assert 'boom' not in result['error']
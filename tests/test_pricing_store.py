@@ -0,0 +1,64 @@
+# test_pricing_store.py
+"""Pricing file reloads reach every cache, and timestamps map to one day"""
+import copy
+import os
+from datetime import date, datetime, timezone
+
+import pytest
+
+from calculator import active_pricing, install_pricing
+from pricing_store import PricingStore, _day, module_pricing_entry, write_pricing_file
+from result_cache import LRUCache, cached_api_cost
+from sensitivity_grid import sensitivity_grid
+from usage_logs import _day_of
+
+@pytest.fixture
+def pricing_file(tmp_path):
+    original = active_pricing()
+    path = str(tmp_path / 'pricing.json')
+    write_pricing_file(path, [module_pricing_entry()])
+    yield path
+    install_pricing(original)
+
+def test_prices_edited_under_same_version_invalidate_caches(pricing_file):
+    store = PricingStore(pricing_file)
+    cache = LRUCache()
+    assert cached_api_cost('openai', 'gpt-4o', 1000, 1000, 1000, cache=cache) == 12.5
+    grid = sensitivity_grid()
+
+    entry = copy.deepcopy(module_pricing_entry())
+    entry['api_pricing']['openai']['gpt-4o']['input'] = 5.0
+    write_pricing_file(pricing_file, [entry])
+    # Same size and possibly the same mtime tick; force a different stamp
+    stat = os.stat(pricing_file)
+    os.utime(pricing_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert store.reload()
+
+    assert active_pricing()['version'] == entry['version']
+    assert cached_api_cost('openai', 'gpt-4o', 1000, 1000, 1000, cache=cache) == 15.0
+    assert sensitivity_grid() is not grid
+
+@pytest.mark.parametrize('when', [
+    '2025-10-31T23:30:00-05:00',
+    datetime.fromisoformat('2025-10-31T23:30:00-05:00'),
+    '2025-11-01T04:30:00Z',
+    '2025-11-01T04:30:00+00:00',
+    datetime(2025, 11, 1, 4, 30, tzinfo=timezone.utc).timestamp(),
+])
+def test_every_timestamp_form_maps_to_the_same_utc_day(when):
+    assert _day(when) == '2025-11-01'
+    if not isinstance(when, datetime):
+        assert _day_of(when) == '2025-11-01'
+
+def test_store_picks_version_by_utc_day(pricing_file):
+    versions = [dict(module_pricing_entry(), version='october', effective_date='2025-10-01'),
+                dict(module_pricing_entry(), version='november', effective_date='2025-11-01')]
+    write_pricing_file(pricing_file, versions)
+    store = PricingStore(pricing_file, activate=False)
+    when = '2025-10-31T23:30:00-05:00'
+    assert store.at(when).version == store.at(datetime.fromisoformat(when)).version == 'november'
+    assert store.at(date(2025, 10, 31)).version == 'october'
+
+def test_unparseable_day_raises():
+    with pytest.raises(ValueError):
+        _day('next tuesday')
@@ -0,0 +1,58 @@
+# test_records.py
+"""Recommendation records must index exactly like the dicts they replaced
+
+tests/data/legacy_recommendations.json holds the dicts that
+optimize_api_usage and analyze_dev_tools returned before records were
+introduced, for a fixed set of workloads and seat maps.
+"""
+import json
+import os
+
+import pytest
+
+from calculator import analyze_dev_tools, generate_summary_report, optimize_api_usage
+from records import Recommendation, Workload, to_json
+
+with open(os.path.join(os.path.dirname(__file__), 'data', 'legacy_recommendations.json'), encoding='utf-8') as _handle:
+    LEGACY = json.load(_handle)
+
+def _case_id(case):
+    return '-'.join(map(str, case['workload'][:2] + case['workload'][-1:])) if 'workload' in case else 'dev_tools'
+
+@pytest.mark.parametrize('case', LEGACY, ids=[_case_id(case) for case in LEGACY])
+def test_records_index_like_legacy_dicts(case):
+    if 'workload' in case:
+        records = optimize_api_usage(*case['workload'])
+    else:
+        records = analyze_dev_tools(case['dev_tools'])
+    assert len(records) == len(case['recommendations'])
+    for record, legacy in zip(records, case['recommendations']):
+        assert isinstance(record, Recommendation)
+        assert list(record) == list(legacy)
+        assert len(record) == len(legacy)
+        for key, value in legacy.items():
+            assert record[key] == value
+            assert record.get(key) == value
+            assert key in record
+        assert 'category' in record or 'category' not in legacy
+        assert record.get('missing', 'default') == 'default'
+        with pytest.raises(KeyError):
+            record['missing']
+        assert record.to_dict() == legacy
+    assert json.dumps(records, default=to_json) == json.dumps(case['recommendations'])
+
+def test_summary_of_records_matches_summary_of_legacy_dicts():
+    records, legacy = [], []
+    for case in LEGACY:
+        records.extend(optimize_api_usage(*case['workload']) if 'workload' in case else
+                       analyze_dev_tools(case['dev_tools']))
+        legacy.extend(case['recommendations'])
+    for kwargs in ({}, {'top_k': 3, 'group_by': 'category'}):
+        summary = generate_summary_report(records, **kwargs)
+        assert json.dumps(summary, default=to_json) == json.dumps(generate_summary_report(legacy, **kwargs))
+
+def test_workload_mapping():
+    workload = Workload('openai', 'gpt-4o', 1_000, 500, 200, 'customer_support')
+    assert dict(workload) == {'provider': 'openai', 'model': 'gpt-4o', 'use_case': 'customer_support',
+                              'monthly_calls': 1_000, 'avg_input_tokens': 500, 'avg_output_tokens': 200}
+    assert Workload.from_mapping(dict(workload)) == workload
@@ -0,0 +1,32 @@
+# test_seat_optimizer.py
+"""Seats are only called idle when their activity data says so"""
+from seat_optimizer import optimize_seats
+
+def idle_users(seats, as_of='2025-10-31'):
+    result = optimize_seats(seats, as_of=as_of)
+    return {user for rec in result['recommendations'] if rec.kind == 'idle_seats' for user in rec.args[3]}
+
+def test_active_days_stand_in_for_missing_last_active():
+    seats = [{'user': 'a', 'tool': 'windsurf', 'tier': 'pro', 'last_active': '', 'active_days': '25'}]
+    assert idle_users(seats) == set()
+
+def test_zero_active_days_or_stale_last_active_is_idle():
+    seats = [
+        {'user': 'a', 'tool': 'windsurf', 'tier': 'pro', 'last_active': '', 'active_days': '0'},
+        {'user': 'b', 'tool': 'cursor', 'tier': 'pro', 'last_active': '2025-08-01', 'active_days': ''},
+        {'user': 'c', 'tool': 'cursor', 'tier': 'pro', 'last_active': '2025-10-30', 'active_days': '12'},
+    ]
+    assert idle_users(seats) == {'a', 'b'}
+
+def test_seat_without_activity_data_is_not_idle():
+    seats = [{'user': 'a', 'tool': 'cursor', 'tier': 'pro', 'last_active': '', 'active_days': ''}]
+    assert idle_users(seats) == set()
+
+def test_duplicate_seats_without_last_active_compare_on_active_days():
+    seats = [
+        {'user': 'a', 'tool': 'cursor', 'tier': 'pro', 'last_active': '', 'active_days': '10'},
+        {'user': 'a', 'tool': 'windsurf', 'tier': 'pro', 'last_active': '2025-10-30', 'active_days': '10'},
+    ]
+    result = optimize_seats(seats, as_of='2025-10-31')
+    duplicates = [rec for rec in result['recommendations'] if rec.kind == 'duplicate_seats']
+    assert [rec.args[0] for rec in duplicates] == ['cursor']
@@ -0,0 +1,40 @@
+# test_token_distribution.py
+"""Quantiles stay inside the occupied bins of a token sketch"""
+import numpy as np
+
+from calculator import optimize_api_usage
+from token_distribution import BIN_EDGES, TokenDistribution, bin_index
+
+def test_single_bin_quantiles_stay_in_that_bin():
+    dist = TokenDistribution.from_requests(np.full(500, 1000), np.full(500, 200))
+    i = int(bin_index(1200))
+    lo, hi = BIN_EDGES[i], BIN_EDGES[i + 1]
+    assert dist.quantile(0.0, 'total') == lo
+    assert dist.quantile(1.0, 'total') == hi
+    assert lo <= dist.quantile(0.5, 'total') <= hi
+
+def test_extreme_quantiles_use_lowest_and_highest_occupied_bins():
+    dist = TokenDistribution.from_requests([10, 100, 100, 5000], [0, 0, 0, 0])
+    assert dist.quantile(0.0) == BIN_EDGES[bin_index(10)]
+    assert dist.quantile(1.0) == BIN_EDGES[bin_index(5000) + 1]
+    # Half the requests are at or below the 100-token bin
+    assert dist.quantile(0.5) == BIN_EDGES[bin_index(100) + 1] - (BIN_EDGES[bin_index(100) + 1] -
+                                                                   BIN_EDGES[bin_index(100)]) / 2
+
+def test_quantiles_are_monotonic():
+    rng = np.random.default_rng(0)
+    dist = TokenDistribution.from_requests(rng.lognormal(7, 1.5, 10_000), rng.lognormal(5, 1, 10_000))
+    values = [dist.quantile(q, 'total') for q in np.linspace(0, 1, 101)]
+    assert values == sorted(values)
+
+def test_empty_distribution_quantile_is_zero():
+    assert TokenDistribution().quantile(1.0) == 0.0
+
+def test_zero_overflow_keeps_recommendations():
+    dist = TokenDistribution.from_requests(np.full(1000, 1000), np.full(1000, 200))
+    plain = optimize_api_usage('openai', 'gpt-4o', 1_000_000, 1000, 200, 'customer_support')
+    sketched = optimize_api_usage('openai', 'gpt-4o', 1_000_000, 1000, 200, 'customer_support',
+                                  token_distribution=dist, max_overflow=0)
+    kinds = {rec.kind for rec in plain} & {'switch', 'routing'}
+    assert kinds
+    assert kinds <= {rec.kind for rec in sketched}
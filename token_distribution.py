@@ -0,0 +1,107 @@
+# token_distribution.py
+"""Mergeable histogram sketch of per-request token counts
+
+Bins are fixed and log-spaced (four per power of two up to 16M tokens), so
+any two sketches merge by adding arrays and every query is O(bins).
+"""
+import numpy as np
+
+BINS_PER_OCTAVE = 4
+MAX_OCTAVE = 24
+BIN_EDGES = np.concatenate([[0.0], 2.0 ** (np.arange(MAX_OCTAVE * BINS_PER_OCTAVE + 1) / BINS_PER_OCTAVE)])
+N_BINS = len(BIN_EDGES) - 1
+
+def bin_index(tokens):
+    """Map token counts to histogram bins; values past the last edge land in the last bin"""
+    idx = np.searchsorted(BIN_EDGES, np.asarray(tokens, dtype=np.float64), side='right') - 1
+    return np.clip(idx, 0, N_BINS - 1)
+
+class TokenDistribution:
+    """Input, output and total (input + output) token histograms for a workload
+
+    Per-bin token sums are kept alongside counts, so means and token shares
+    are exact while quantiles and context overflow are interpolated.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.input_counts = np.zeros(N_BINS, dtype=np.int64)
+        self.output_counts = np.zeros(N_BINS, dtype=np.int64)
+        self.total_counts = np.zeros(N_BINS, dtype=np.int64)
+        self.input_sums = np.zeros(N_BINS, dtype=np.float64)
+        self.output_sums = np.zeros(N_BINS, dtype=np.float64)
+
+    @classmethod
+    def from_requests(cls, input_tokens, output_tokens):
+        """Build a sketch from per-request token arrays"""
+        dist = cls()
+        dist.add_many(input_tokens, output_tokens)
+        return dist
+
+    def add_many(self, input_tokens, output_tokens):
+        """Add a batch of requests"""
+        input_tokens = np.asarray(input_tokens, dtype=np.float64).reshape(-1)
+        output_tokens = np.asarray(output_tokens, dtype=np.float64).reshape(-1)
+        if not len(input_tokens):
+            return self
+        input_bins = bin_index(input_tokens)
+        output_bins = bin_index(output_tokens)
+        self.input_counts += np.bincount(input_bins, minlength=N_BINS)
+        self.output_counts += np.bincount(output_bins, minlength=N_BINS)
+        self.total_counts += np.bincount(bin_index(input_tokens + output_tokens), minlength=N_BINS)
+        self.input_sums += np.bincount(input_bins, weights=input_tokens, minlength=N_BINS)
+        self.output_sums += np.bincount(output_bins, weights=output_tokens, minlength=N_BINS)
+        self.count += len(input_tokens)
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        self.count += other.count
+        self.input_counts += other.input_counts
+        self.output_counts += other.output_counts
+        self.total_counts += other.total_counts
+        self.input_sums += other.input_sums
+        self.output_sums += other.output_sums
+        return self
+
+    @property
+    def mean_input(self):
+        return float(self.input_sums.sum() / self.count) if self.count else 0.0
+
+    @property
+    def mean_output(self):
+        return float(self.output_sums.sum() / self.count) if self.count else 0.0
+
+    def quantile(self, q, which='input'):
+        """Approximate quantile of 'input', 'output' or 'total' tokens"""
+        counts = getattr(self, f'{which}_counts')
+        if not self.count:
+            return 0.0
+        # Only non-empty bins, so the cumulative counts strictly increase and
+        # q=0 and q=1 land on the edges of the lowest and highest occupied bins
+        occupied = np.flatnonzero(counts)
+        cumulative = np.cumsum(counts[occupied])
+        target = q * self.count
+        k = min(int(np.searchsorted(cumulative, target, side='left')), len(occupied) - 1)
+        i = occupied[k]
+        fraction = min(max((target - (cumulative[k] - counts[i])) / counts[i], 0.0), 1.0)
+        return float(BIN_EDGES[i] + fraction * (BIN_EDGES[i + 1] - BIN_EDGES[i]))
+
+    def overflow_fraction(self, context):
+        """Fraction of requests whose input + output exceeds each context window"""
+        if not self.count:
+            return np.zeros(np.shape(context))
+        cumulative = np.concatenate([[0], np.cumsum(self.total_counts)])
+        within = np.interp(np.asarray(context, dtype=np.float64), BIN_EDGES, cumulative)
+        return (self.count - within) / self.count
+
+    def input_share_above(self, tokens):
+        """Share of input tokens sent by requests with more than `tokens` input tokens"""
+        total = self.input_sums.sum()
+        if not total:
+            return 0.0
+        # Within the straddling bin assume tokens are spread evenly
+        i = int(bin_index(tokens))
+        lo, hi = BIN_EDGES[i], BIN_EDGES[i + 1]
+        partial = self.input_sums[i] * max(0.0, (hi - tokens) / (hi - lo))
+        return float((self.input_sums[i + 1:].sum() + partial) / total)
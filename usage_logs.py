@@ -0,0 +1,407 @@
+# usage_logs.py
+"""Streaming ingestion and cost attribution for per-call usage logs
+
+Logs are JSONL or CSV with one API call per line:
+    provider, model, input_tokens, output_tokens, timestamp, use_case
+"""
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from calculator import active_pricing, optimize_api_usage, generate_summary_report
+from pricing_store import utc_day
+from records import Workload
+from token_distribution import TokenDistribution
+
+LOG_FIELDS = ('provider', 'model', 'input_tokens', 'output_tokens', 'timestamp', 'use_case')
+DEFAULT_CHUNK_SIZE = 50_000
+UNKNOWN_DAY = 'unknown'
+UNKNOWN_USE_CASE = 'unknown'
+
+def _day_of(timestamp):
+    """Reduce an ISO-8601 string or epoch seconds to a YYYY-MM-DD UTC day"""
+    if timestamp is None or timestamp == '':
+        return UNKNOWN_DAY
+    return utc_day(timestamp) or UNKNOWN_DAY
+
+def detect_format(path):
+    """Guess log format from the file extension"""
+    return 'csv' if str(path).lower().endswith('.csv') else 'jsonl'
+
+def _parse_jsonl(lines, errors):
+    records = []
+    loads = json.loads
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = loads(line)
+            records.append((
+                row['provider'], row['model'],
+                int(row.get('input_tokens') or 0), int(row.get('output_tokens') or 0),
+                _day_of(row.get('timestamp')), row.get('use_case') or UNKNOWN_USE_CASE,
+            ))
+        except (ValueError, KeyError, TypeError):
+            errors[0] += 1
+    return records
+
+def _read_csv_header(stream):
+    header = next(csv.reader([stream.readline()]), None)
+    return [name.strip() for name in header] if header else None
+
+def _parse_csv(lines, header, errors):
+    records = []
+    column = {name: i for i, name in enumerate(header)}
+    try:
+        p, m, i, o = (column[f] for f in LOG_FIELDS[:4])
+    except KeyError as exc:
+        raise ValueError(f'CSV log is missing column {exc}') from None
+    t, u = column.get('timestamp'), column.get('use_case')
+    for row in csv.reader(lines):
+        if not row:
+            continue
+        try:
+            records.append((
+                row[p], row[m], int(row[i] or 0), int(row[o] or 0),
+                _day_of(row[t]) if t is not None else UNKNOWN_DAY,
+                (row[u] if u is not None else '') or UNKNOWN_USE_CASE,
+            ))
+        except (ValueError, IndexError):
+            errors[0] += 1
+    return records
+
+def iter_log_chunks(stream, fmt='jsonl', chunk_size=DEFAULT_CHUNK_SIZE, errors=None):
+    """Yield lists of parsed (provider, model, in, out, day, use_case) tuples"""
+    errors = errors if errors is not None else [0]
+    header = None
+    if fmt == 'csv':
+        header = _read_csv_header(stream)
+        if not header:
+            return
+    while True:
+        lines = list(islice(stream, chunk_size))
+        if not lines:
+            return
+        if fmt == 'csv':
+            yield _parse_csv(lines, header, errors)
+        else:
+            yield _parse_jsonl(lines, errors)
+
+class UsageAggregate:
+    """Mergeable call and token totals keyed by provider, model, day and use case
+
+    Token totals are exact integers and cost is linear in tokens, so every
+    record is priced through its group totals. That keeps merged results
+    independent of ingestion order. With track_distributions, a
+    TokenDistribution is also kept per provider/model/use case.
+    """
+
+    def __init__(self, track_distributions=False):
+        self.groups = {}
+        self.records = 0
+        self.parse_errors = 0
+        self.distributions = {} if track_distributions else None
+
+    def add_records(self, records):
+        """Accumulate parsed log tuples"""
+        groups = self.groups
+        for provider, model, input_tokens, output_tokens, day, use_case in records:
+            key = (provider, model, day, use_case)
+            totals = groups.get(key)
+            if totals is None:
+                groups[key] = [1, input_tokens, output_tokens]
+            else:
+                totals[0] += 1
+                totals[1] += input_tokens
+                totals[2] += output_tokens
+        self.records += len(records)
+        if self.distributions is not None:
+            self._add_distributions(records)
+
+    def _add_distributions(self, records):
+        tokens = {}
+        for provider, model, input_tokens, output_tokens, _day, use_case in records:
+            pair = tokens.get((provider, model, use_case))
+            if pair is None:
+                tokens[(provider, model, use_case)] = pair = ([], [])
+            pair[0].append(input_tokens)
+            pair[1].append(output_tokens)
+        for key, (input_tokens, output_tokens) in tokens.items():
+            dist = self.distributions.get(key)
+            if dist is None:
+                self.distributions[key] = dist = TokenDistribution()
+            dist.add_many(input_tokens, output_tokens)
+
+    def merge(self, other):
+        """Fold another aggregate into this one"""
+        groups = self.groups
+        for key, (calls, input_tokens, output_tokens) in other.groups.items():
+            totals = groups.get(key)
+            if totals is None:
+                groups[key] = [calls, input_tokens, output_tokens]
+            else:
+                totals[0] += calls
+                totals[1] += input_tokens
+                totals[2] += output_tokens
+        self.records += other.records
+        self.parse_errors += other.parse_errors
+        if self.distributions is not None and other.distributions is not None:
+            for key, dist in other.distributions.items():
+                if key in self.distributions:
+                    self.distributions[key].merge(dist)
+                else:
+                    self.distributions[key] = dist
+        return self
+
+    def rows(self, price_matrix=None, store=None):
+        """Priced rows per group; unknown models get cost None
+
+        With a PricingStore, each day is priced at the version in effect
+        on that day instead of a single price matrix.
+        """
+        keys = list(self.groups)
+        if not keys:
+            return []
+        if store is not None:
+            matrices = [store.at(None if k[2] == UNKNOWN_DAY else k[2]).tables['price_matrix'] for k in keys]
+        else:
+            matrices = [price_matrix or active_pricing()['price_matrix']] * len(keys)
+        totals = np.array([self.groups[k] for k in keys], dtype=np.float64).reshape(-1, 3)
+        costs = np.zeros(len(keys))
+        known = np.zeros(len(keys), dtype=bool)
+        # Price all groups sharing a price matrix in one vectorised pass
+        by_matrix = {}
+        for i, matrix in enumerate(matrices):
+            by_matrix.setdefault(id(matrix), (matrix, []))[1].append(i)
+        for matrix, members in by_matrix.values():
+            members = np.array(members)
+            index = matrix['index']
+            model_idx = np.array([index.get(keys[i][:2], -1) for i in members])
+            found = model_idx >= 0
+            prices = matrix['prices'][:, np.where(found, model_idx, 0)]
+            costs[members] = ((totals[members, 1] / 1_000_000) * prices[0]
+                              + (totals[members, 2] / 1_000_000) * prices[1])
+            known[members] = found
+        rows = []
+        for i, (provider, model, day, use_case) in enumerate(keys):
+            calls, input_tokens, output_tokens = self.groups[(provider, model, day, use_case)]
+            rows.append({
+                'provider': provider,
+                'model': model,
+                'day': day,
+                'use_case': use_case,
+                'calls': calls,
+                'input_tokens': input_tokens,
+                'output_tokens': output_tokens,
+                'cost': float(costs[i]) if known[i] else None,
+            })
+        return rows
+
+    def spend_by(self, *dimensions, price_matrix=None, store=None):
+        """Roll priced rows up to the given dimensions, e.g. spend_by('provider', 'day')"""
+        rollup = {}
+        for row in self.rows(price_matrix, store):
+            key = tuple(row[d] for d in dimensions) if len(dimensions) != 1 else row[dimensions[0]]
+            entry = rollup.setdefault(key, {'calls': 0, 'input_tokens': 0, 'output_tokens': 0, 'cost': 0.0, 'unpriced_calls': 0})
+            entry['calls'] += row['calls']
+            entry['input_tokens'] += row['input_tokens']
+            entry['output_tokens'] += row['output_tokens']
+            if row['cost'] is None:
+                entry['unpriced_calls'] += row['calls']
+            else:
+                entry['cost'] += row['cost']
+        return rollup
+
+    def invoice(self, tables=None, store=None):
+        """Exact invoice lines per provider and model
+
+        Integer token totals are priced in integer nano-cents and each line
+        is rounded to the cent once, so lines reconcile with provider
+        invoices at any volume. With a PricingStore, each day is priced at
+        the version in effect on that day. Unknown models get cost None.
+        """
+        from money import cents_to_dollars, price_to_nanocents, to_cents
+        tables = tables or active_pricing()
+        day_tables, prices, lines = {}, {}, {}
+        for (provider, model, day, _use_case), (calls, input_tokens, output_tokens) in self.groups.items():
+            if store is not None:
+                if day not in day_tables:
+                    day_tables[day] = store.at(None if day == UNKNOWN_DAY else day).tables
+                version = day_tables[day]
+            else:
+                version = tables
+            key = (id(version), provider, model)
+            if key not in prices:
+                pricing = version['api_pricing'].get(provider, {}).get(model)
+                prices[key] = None if pricing is None else (
+                    price_to_nanocents(pricing['input']), price_to_nanocents(pricing['output']))
+            line = lines.setdefault((provider, model), [0, 0, 0, 0])
+            line[0] += calls
+            line[1] += input_tokens
+            line[2] += output_tokens
+            if prices[key] is None or line[3] is None:
+                line[3] = None
+            else:
+                line[3] += input_tokens * prices[key][0] + output_tokens * prices[key][1]
+        rows = []
+        for (provider, model), (calls, input_tokens, output_tokens, nanocents) in lines.items():
+            cents = None if nanocents is None else to_cents(nanocents)
+            rows.append({
+                'provider': provider,
+                'model': model,
+                'calls': calls,
+                'input_tokens': input_tokens,
+                'output_tokens': output_tokens,
+                'cost_cents': cents,
+                'cost': None if cents is None else cents_to_dollars(cents),
+            })
+        return rows
+
+    def workloads(self):
+        """Averaged workloads per provider/model/use case, shaped for optimize_api_usage"""
+        merged = {}
+        for (provider, model, _day, use_case), (calls, input_tokens, output_tokens) in self.groups.items():
+            totals = merged.setdefault((provider, model, use_case), [0, 0, 0])
+            totals[0] += calls
+            totals[1] += input_tokens
+            totals[2] += output_tokens
+        return [
+            Workload(provider, model, calls, input_tokens / calls, output_tokens / calls, use_case)
+            for (provider, model, use_case), (calls, input_tokens, output_tokens) in merged.items()
+        ]
+
+def ingest_stream(stream, fmt='jsonl', chunk_size=DEFAULT_CHUNK_SIZE, aggregate=None):
+    """Ingest an open text stream chunk by chunk into a UsageAggregate"""
+    aggregate = aggregate if aggregate is not None else UsageAggregate()
+    errors = [0]
+    for records in iter_log_chunks(stream, fmt, chunk_size, errors):
+        aggregate.add_records(records)
+    aggregate.parse_errors += errors[0]
+    return aggregate
+
+def ingest_log(path, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE, track_distributions=False):
+    """Ingest a JSONL or CSV usage log with constant memory"""
+    fmt = fmt or detect_format(path)
+    with open(path, 'r', encoding='utf-8', newline='', buffering=io.DEFAULT_BUFFER_SIZE * 16) as stream:
+        return ingest_stream(stream, fmt, chunk_size, UsageAggregate(track_distributions))
+
+def split_byte_ranges(path, n_ranges):
+    """Split a file into n_ranges contiguous (start, end) byte ranges"""
+    size = os.path.getsize(path)
+    n_ranges = max(1, min(n_ranges, size or 1))
+    bounds = [size * i // n_ranges for i in range(n_ranges + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(n_ranges) if bounds[i] < bounds[i + 1]]
+
+def _iter_range_chunks(stream, start, end, chunk_size):
+    """Yield chunks of raw lines that start inside [start, end)"""
+    # A line belongs to the range its first byte falls in, so skip the
+    # partial line at start; the previous range reads it to completion.
+    if start > 0:
+        stream.seek(start - 1)
+        position = start - 1 + len(stream.readline())
+    else:
+        stream.seek(0)
+        position = 0
+    while position < end:
+        lines = []
+        while position < end and len(lines) < chunk_size:
+            line = stream.readline()
+            if not line:
+                break
+            position += len(line)
+            lines.append(line)
+        if not lines:
+            return
+        yield lines
+
+def _ingest_range(path, fmt, start, end, header, chunk_size, track_distributions):
+    """Worker: aggregate the lines of one byte range"""
+    aggregate = UsageAggregate(track_distributions)
+    errors = [0]
+    with open(path, 'rb') as stream:
+        if fmt == 'csv' and start == 0:
+            # The header line is owned by range 0; skip it
+            start = len(stream.readline())
+            if start >= end:
+                return aggregate
+        for lines in _iter_range_chunks(stream, start, end, chunk_size):
+            if fmt == 'csv':
+                records = _parse_csv([line.decode('utf-8') for line in lines], header, errors)
+            else:
+                records = _parse_jsonl(lines, errors)
+            aggregate.add_records(records)
+    aggregate.parse_errors += errors[0]
+    return aggregate
+
+def ingest_log_parallel(path, workers=None, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE, ranges_per_worker=4,
+                        track_distributions=False):
+    """Ingest a usage log across a process pool, one byte range per task
+
+    Partial aggregates are merged in file order, which reproduces the
+    single-process result exactly, group order included.
+    """
+    fmt = fmt or detect_format(path)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return ingest_log(path, fmt, chunk_size, track_distributions)
+    header = None
+    if fmt == 'csv':
+        with open(path, 'r', encoding='utf-8', newline='') as stream:
+            header = _read_csv_header(stream)
+        if not header:
+            return UsageAggregate(track_distributions)
+    ranges = split_byte_ranges(path, workers * ranges_per_worker)
+    aggregate = UsageAggregate(track_distributions)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_ingest_range, path, fmt, start, end, header, chunk_size, track_distributions)
+            for start, end in ranges
+        ]
+        for future in futures:
+            aggregate.merge(future.result())
+    return aggregate
+
+def analyze_usage(aggregate, price_matrix=None, top_k=5, keep_all=True):
+    """Run optimize_api_usage over every priced workload and summarise the result
+
+    Recommendations are streamed into generate_summary_report; with
+    keep_all=False only the top_k are held in memory.
+    """
+    index = (price_matrix or active_pricing()['price_matrix'])['index']
+    distributions = aggregate.distributions or {}
+
+    def recommendations():
+        for workload in aggregate.workloads():
+            if (workload.provider, workload.model) not in index:
+                continue
+            yield from optimize_api_usage(
+                workload.provider, workload.model, workload.monthly_calls,
+                workload.avg_input_tokens, workload.avg_output_tokens, workload.use_case,
+                token_distribution=distributions.get((workload.provider, workload.model, workload.use_case)),
+            )
+
+    return generate_summary_report(recommendations(), top_k=top_k, keep_all=keep_all)
+
+def measure_scaling(path, max_workers=None, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Time ingestion of one log with 1..max_workers processes"""
+    max_workers = max_workers or os.cpu_count() or 1
+    results = []
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        started = time.perf_counter()
+        aggregate = ingest_log_parallel(path, workers, fmt, chunk_size)
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        results.append({
+            'workers': workers,
+            'seconds': elapsed,
+            'records_per_sec': aggregate.records / elapsed if elapsed else 0,
+            'speedup': baseline / elapsed if elapsed else 0,
+        })
+    return results